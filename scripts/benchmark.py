@@ -0,0 +1,475 @@
+"""Benchmarks for the Python pipeline.
+
+    python benchmark.py parse [--baseline DIR]
+    python benchmark.py jp [--baseline DIR]
+    python benchmark.py importtime [--baseline DIR]
+    python benchmark.py derive [--baseline DIR]
+    python benchmark.py rows
+
+`--baseline` points to another checkout's `shared/python`, e.g. one made with
+`git worktree add`, so that two versions can be compared on the same data.
+"""
+
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import partial
+
+from conformance import check_conformance
+from env_setup import DATA_PATH, SRC_PATH
+
+
+def load_pinyin() -> dict[str, list[str]]:
+    """記錄讀音 and 推導讀音 of every language, as exported."""
+
+    with open(DATA_PATH / "generated" / "MC.json", "r", encoding="utf-8") as f:
+        mc_entries = json.load(f).values()
+
+    texts = {}
+    for lang_en in ["FG", "PM", "GC", "SW", "MH", "JP", "KR", "VN"]:
+        path = DATA_PATH / "generated" / f"{lang_en}.json"
+        if not path.exists():
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            texts[lang_en] = [
+                row["記錄讀音"] for row in json.load(f) if row["記錄讀音"]
+            ]
+        texts[lang_en] += [
+            entry["reflex"][lang_en]
+            for entry in mc_entries
+            if entry["reflex"].get(lang_en)
+        ]
+    return texts
+
+
+# Final tables built by compile_finals; emptied, the parsers fall back to the
+# split functions they were compiled from.
+COMPILED_FINALS = {
+    "FG": ["_IPA_FINAL_MAP", "_PINYIN_FINAL_MAP"],
+    "GC": ["_MEDIAL_FINAL_MAP"],
+    "MH": ["_IPA_FINAL_MAP", "_PINYIN_FINAL_MAP"],
+}
+
+
+class ProbingPrefix:
+    """PrefixTable.match by brute force, probing every length down to 0."""
+
+    def __init__(self, prefixes):
+        self.table = prefixes.table
+        self.reverse = prefixes.reverse
+        self.longest = max(map(len, self.table), default=0)
+
+    def match(self, text: str, start: int = 0, stop: int | None = None):
+        stop = len(text) if stop is None else stop
+        for length in range(min(self.longest, stop - start), -1, -1):
+            if self.reverse:
+                key = text[stop - length : stop]
+            else:
+                key = text[start : start + length]
+            if key in self.table:
+                return length, self.table[key]
+        raise KeyError(text[start:stop])
+
+
+@contextmanager
+def uncompiled(syllable_cls):
+    """Swaps the prefix and final tables of a class for the old lookups."""
+    from phonology.syllable import PrefixTable
+
+    originals = {
+        name: value
+        for name, value in vars(syllable_cls).items()
+        if isinstance(value, PrefixTable)
+        or name
+        in COMPILED_FINALS.get(syllable_cls.__module__.split(".")[-1].upper(), [])
+    }
+    try:
+        for name, value in originals.items():
+            setattr(
+                syllable_cls,
+                name,
+                ProbingPrefix(value) if isinstance(value, PrefixTable) else {},
+            )
+        yield
+    finally:
+        for name, value in originals.items():
+            setattr(syllable_cls, name, value)
+
+
+def check_compiled(syllable_cls, method: str, texts: list[str]) -> list[str]:
+    """Texts that the compiled and the uncompiled parser disagree on."""
+
+    def parse_all() -> list:
+        parse = uncached(syllable_cls, method)
+        results = []
+        for text in texts:
+            try:
+                results.append(parse(text).tuple)
+            except Exception as e:
+                results.append(type(e))
+        return results
+
+    compiled = parse_all()
+    with uncompiled(syllable_cls):
+        reference = parse_all()
+    return [
+        f"{syllable_cls.__name__}.{method}({text!r}): {new} != {old}"
+        for text, new, old in zip(texts, compiled, reference)
+        if new != old
+    ]
+
+
+def measure_parse() -> dict:
+    import phonology.syllable
+    from phonology import SYLLABLE_MAP
+
+    report = {"failures": check_conformance(SYLLABLE_MAP), "langs": {}}
+    # a baseline checkout may predate the compiled tables
+    differential = hasattr(phonology.syllable, "PrefixTable")
+    for lang_en, texts in load_pinyin().items():
+        syllable_cls = SYLLABLE_MAP[lang_en]
+        distinct = sorted(set(texts))
+        if hasattr(syllable_cls, "cache_clear"):
+            syllable_cls.cache_clear()
+
+        def parse_all(texts: list[str], parse=syllable_cls.parse_pinyin) -> float:
+            start = time.perf_counter()
+            for text in texts:
+                try:
+                    parse(text)
+                except Exception:
+                    pass
+            return time.perf_counter() - start
+
+        report["langs"][lang_en] = {
+            "rows": len(texts),
+            "distinct": len(distinct),
+            "distinct_ms": parse_all(distinct) * 1000,
+            "rows_ms": parse_all(texts) * 1000,
+            # the parser alone, without the cache and the intern table
+            "parser_ms": min(
+                parse_all(distinct, uncached(syllable_cls, "parse_pinyin"))
+                for _ in range(5)
+            )
+            * 1000,
+        }
+
+        # the compiled parsers must agree with the split functions they replace
+        if differential:
+            inputs = {"parse_pinyin": distinct}
+            if hasattr(syllable_cls, "parse_ipa"):
+                syllables, _ = syllable_cls.parse_many(distinct, errors="skip")
+                inputs["parse_ipa"] = sorted(
+                    {"".join(syllable.tuple) for syllable in syllables if syllable}
+                )
+            for method, method_texts in inputs.items():
+                report["failures"] += check_compiled(syllable_cls, method, method_texts)
+            report["langs"][lang_en]["checked"] = sum(map(len, inputs.values()))
+    return report
+
+
+def uncached(syllable_cls, method: str):
+    """The parser behind the parse cache and the intern table, if there are any."""
+    parse = getattr(syllable_cls, method)
+    if hasattr(parse, "__wrapped__"):
+        return partial(inspect.unwrap(parse), syllable_cls)
+    return parse
+
+
+def measure_jp() -> dict:
+    from phonology import JPSyllable
+
+    with open(DATA_PATH / "generated" / "JP.json", "r", encoding="utf-8") as f:
+        texts = [row["記錄讀音"] for row in json.load(f) if row["記錄讀音"]]
+
+    parse = uncached(JPSyllable, "parse_pinyin")
+    start = time.perf_counter()
+    syllables = [parse(text) for text in texts]
+    report = {"rows": len(texts), "rows_ms": (time.perf_counter() - start) * 1000}
+
+    distinct = set(syllables)
+    for format in ["kata", "hira", "NR", "HR"]:
+        spellings = [syllable.pinyin(format) for syllable in distinct]
+        start = time.perf_counter()
+        for text in spellings:
+            parse(text, format)
+        report[format] = {
+            "distinct": len(spellings),
+            "ms": (time.perf_counter() - start) * 1000,
+        }
+    return report
+
+
+def load_mc_rows() -> list[dict]:
+    """小韻 rows as stored in 小韻全, rebuilt from the exported MC.json."""
+    with open(DATA_PATH / "generated" / "MC.json", "r", encoding="utf-8") as f:
+        mc_entries = json.load(f)
+    return [{**entry["MC"], "小韻號": int(key)} for key, entry in mc_entries.items()]
+
+
+def measure_derive(repeat: int = 5) -> dict:
+    from predict import REFLEX_GETTER_MAP
+
+    rows = load_mc_rows()
+    report = {}
+    for lang_en, get_reflex in REFLEX_GETTER_MAP.items():
+
+        def derive_all() -> tuple[float, list[dict]]:
+            batch = [dict(row) for row in rows]  # derivation may write to rows
+            start = time.perf_counter()
+            if hasattr(get_reflex, "derive_batch"):
+                reflexes = get_reflex.derive_batch(batch)
+            else:
+                reflexes = [get_reflex(row) for row in batch]
+            return time.perf_counter() - start, reflexes
+
+        timings = []
+        for _ in range(repeat):
+            if hasattr(get_reflex, "cache_clear"):
+                get_reflex.cache_clear()
+            elapsed, reflexes = derive_all()
+            timings.append(elapsed)
+        report[lang_en] = {
+            "rows": len(rows),
+            "ms": min(timings) * 1000,
+            "warm_ms": derive_all()[0] * 1000,
+            "digest": hashlib.sha256(repr(reflexes).encode("utf-8")).hexdigest(),
+        }
+        if hasattr(get_reflex, "cache_info"):
+            report[lang_en]["positions"] = get_reflex.cache_info().positions
+    return report
+
+
+def show_derive(reports: dict[str, dict]) -> None:
+    for name, report in reports.items():
+        print(f"[{name}]")
+        for lang_en, stats in report.items():
+            positions = stats.get("positions", stats["rows"])
+            print(
+                f"  {lang_en}: {stats['rows']} 個小韻 / {positions} 種音韻地位，"
+                f"首次推導 {stats['ms']:.1f} ms，"
+                f"再次推導 {stats['warm_ms']:.1f} ms，"
+                f"結果 {stats['digest'][:12]}"
+            )
+
+
+def show_jp(reports: dict[str, dict]) -> None:
+    for name, report in reports.items():
+        print(
+            f"[{name}] 日本語 {report['rows']} 行（不計緩存）："
+            f"{report['rows_ms']:.1f} ms"
+        )
+        for format in ["kata", "hira", "NR", "HR"]:
+            stats = report[format]
+            print(f"  {format}: {stats['distinct']} 種，{stats['ms']:.1f} ms")
+
+
+def read_data(session, table: str) -> list[dict]:
+    session.cursor.execute(f"SELECT * FROM {table}")
+    return session.data
+
+
+# Ways of reading a whole table: Updater.data, then Updater.iter_rows
+ROW_READERS = {
+    "data": read_data,
+    "dict": lambda session, table: session.iter_rows(table),
+    "record": lambda session, table: session.iter_rows(table, record="record"),
+    "tuple": lambda session, table: session.iter_rows(table, record="tuple"),
+    "tuple 2 列": lambda session, table: session.iter_rows(
+        table, ["字頭", "小韻號"], record="tuple"
+    ),
+}
+
+
+def measure_rows(repeat: int = 3) -> dict:
+    """Time and peak traced memory of reading the largest table with each reader."""
+    from phonology import SYLLABLE_MAP
+    from updater import Updater
+
+    session = Updater(mode="ro")
+    tables = ["字頭", *[syllable_cls.NAME for syllable_cls in SYLLABLE_MAP.values()]]
+    sizes = {
+        table: session.cursor.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        for table in tables
+    }
+    table = max(sizes, key=sizes.get)
+
+    def consume(rows) -> int:
+        count = 0
+        for _ in rows:
+            count += 1
+        return count
+
+    report = {"table": table, "rows": sizes[table], "readers": {}}
+    for name, read in ROW_READERS.items():
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            consume(read(session, table))
+            timings.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        consume(read(session, table))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        report["readers"][name] = {"ms": min(timings) * 1000, "peak": peak}
+    return report
+
+
+def show_rows(reports: dict[str, dict]) -> None:
+    for name, report in reports.items():
+        print(f"[{name}] {report['table']} {report['rows']} 行")
+        for reader, stats in report["readers"].items():
+            print(
+                f"  {reader}: {stats['ms']:.1f} ms，"
+                f"內存峰值 {stats['peak'] / 1024 / 1024:.1f} MiB"
+            )
+
+
+# What a script that needs one language, or every language, has to import;
+# "updater" is what every export and update script under scripts/ imports.
+IMPORT_SCENARIOS = {
+    "FG": "import phonology, predict; "
+    "phonology.SYLLABLE_MAP['FG']; predict.REFLEX_GETTER_MAP['FG']",
+    "全部": "import phonology, predict; "
+    "[*phonology.SYLLABLE_MAP.values(), *predict.REFLEX_GETTER_MAP.values()]",
+    "updater": "import updater",
+}
+
+
+# Runs a scenario and reports its wall time and the project modules it loaded.
+# -X importtime does not see modules loaded through importlib.import_module, so
+# the wall time is measured as well.
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+modules = [m for m in sys.modules if m.split(".")[0] in ("phonology", "predict")]
+print(json.dumps({{"ms": elapsed * 1000, "modules": sorted(modules)}}))
+"""
+
+
+def import_times(code: str, src: str) -> dict:
+    """Wall time of `code`, and self time in microseconds per imported module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_PROBE.format(code=code)],
+        capture_output=True,
+        check=True,
+        text=True,
+        encoding="utf-8",
+        # `python -c` puts the working directory first on sys.path, so the
+        # updater scenario imports the scripts/ of the same checkout
+        cwd=os.path.join(src, "..", "..", "scripts"),
+        env={**os.environ, "PYTHONPATH": src},
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(self_us)
+    return {**json.loads(result.stdout), "importtime": times}
+
+
+def measure_importtime(repeat: int = 5) -> dict:
+    src = sys.path[0]
+    report = {}
+    for scenario, code in IMPORT_SCENARIOS.items():
+        runs = [import_times(code, src) for _ in range(repeat)]
+        fastest = min(runs, key=lambda run: run["ms"])
+        slowest = sorted(fastest["importtime"].items(), key=lambda item: -item[1])
+        report[scenario] = {
+            "modules": fastest["modules"],
+            "ms": fastest["ms"],
+            "slowest": slowest[:3],
+        }
+    return report
+
+
+def show_importtime(reports: dict[str, dict]) -> None:
+    for name, report in reports.items():
+        print(f"[{name}]")
+        for scenario, stats in report.items():
+            print(
+                f"  {scenario}: 載入 {len(stats['modules'])} 個模塊，"
+                f"{stats['ms']:.1f} ms"
+            )
+            for module, us in stats["slowest"]:
+                print(f"    {module}: {us / 1000:.1f} ms")
+
+
+def run_worker(command: str, src: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, __file__, command, "--worker", "--src", src],
+        capture_output=True,
+        check=True,
+        text=True,
+        encoding="utf-8",
+    )
+    return json.loads(result.stdout)
+
+
+def show_parse(reports: dict[str, dict]) -> None:
+    for name, report in reports.items():
+        print(f"[{name}]")
+        for failure in report["failures"]:
+            print(f"  不一致：{failure}")
+        for lang_en, stats in report["langs"].items():
+            print(
+                f"  {lang_en}: {stats['rows']} 行 / {stats['distinct']} 種，"
+                f"首次解析 {stats['distinct_ms']:.1f} ms，"
+                f"逐行解析 {stats['rows_ms']:.1f} ms，"
+                f"解析器本身 {stats['parser_ms']:.1f} ms"
+                + (
+                    f"，與拆分函數比對 {stats['checked']} 種"
+                    if "checked" in stats
+                    else ""
+                )
+            )
+
+
+COMMANDS = {
+    "parse": (measure_parse, show_parse),
+    "jp": (measure_jp, show_jp),
+    "importtime": (measure_importtime, show_importtime),
+    "derive": (measure_derive, show_derive),
+    "rows": (measure_rows, show_rows),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("command", choices=COMMANDS)
+    parser.add_argument("--baseline", help="another shared/python to compare with")
+    parser.add_argument("--src", help=argparse.SUPPRESS)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    measure, show = COMMANDS[args.command]
+
+    if args.worker:
+        sys.path.insert(0, args.src)
+        print(json.dumps(measure(), default=str, ensure_ascii=False))
+        return
+
+    reports = {"current": run_worker(args.command, str(SRC_PATH))}
+    if args.baseline:
+        reports["baseline"] = run_worker(args.command, args.baseline)
+    show(reports)
+    if any(report.get("failures") for report in reports.values()):
+        sys.exit("有不一致的結果！")
+
+
+if __name__ == "__main__":
+    main()
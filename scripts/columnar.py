@@ -0,0 +1,131 @@
+"""
+Columnar, dictionary-encoded JSON for the dialect dictionaries.
+
+A `{lang_en}.columns.json` file holds the same rows as `{lang_en}.json`, stored
+column by column:
+
+    {
+        "length": 3,
+        "columns": {
+            "字頭": ["東", "同", "董"],
+            "層": {"table": [null, "白", "文"], "codes": [1, 0, 2]},
+            ...
+        }
+    }
+
+A column whose values repeat enough is replaced by a string table and one
+index per row; other columns are plain arrays.
+"""
+
+import json
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Iterator
+
+from output import atomic_write
+
+
+def encode_column(values: list) -> list | dict:
+    """Dictionary-encodes `values` when that makes the column smaller."""
+
+    table, codes = [], []
+    index = {}
+    for value in values:
+        if value not in index:
+            index[value] = len(table)
+            table.append(value)
+        codes.append(index[value])
+
+    plain = len(json.dumps(values, separators=(",", ":"), ensure_ascii=False))
+    encoded = len(json.dumps([table, codes], separators=(",", ":"), ensure_ascii=False))
+    if encoded < plain:
+        return {"table": table, "codes": codes}
+    return values
+
+
+class ColumnarWriter:
+    """Collects rows and writes them as columns, atomically, on exit.
+
+    Same interface as `output.JSONArrayWriter`; every row must have the keys
+    of the first one.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.count = 0
+        self._columns: dict[str, list] = {}
+
+    def __enter__(self) -> "ColumnarWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if exc_info[0] is not None:
+            return
+        data = {
+            "length": self.count,
+            "columns": {
+                key: encode_column(values) for key, values in self._columns.items()
+            },
+        }
+        with atomic_write(self.path) as f:
+            json.dump(data, f, separators=(",", ":"), ensure_ascii=False)
+
+    def write(self, item: dict[str, Any]) -> None:
+        if not self._columns:
+            self._columns = {key: [] for key in item}
+        for key, values in self._columns.items():
+            values.append(item[key])
+        self.count += 1
+
+    def write_all(self, items) -> None:
+        for item in items:
+            self.write(item)
+
+
+class ColumnarReader(Sequence):
+    """Rows of a columnar file, rebuilt as dicts only when accessed.
+
+    rows = ColumnarReader.load(path)
+    rows[0]             # {"字頭": ..., "記錄讀音": ..., ...}
+    rows.column("層")   # the decoded column
+    """
+
+    def __init__(self, data: dict):
+        self._length = data["length"]
+        self._columns = data["columns"]
+        self._keys = list(self._columns)
+
+    @classmethod
+    def load(cls, path: Path) -> "ColumnarReader":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("row index out of range")
+        return {key: self._value(key, index) for key in self._keys}
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        columns = [self.column(key) for key in self._keys]
+        for values in zip(*columns):
+            yield dict(zip(self._keys, values))
+
+    def _value(self, key: str, index: int) -> Any:
+        column = self._columns[key]
+        if isinstance(column, dict):
+            return column["table"][column["codes"][index]]
+        return column[index]
+
+    def column(self, key: str) -> list:
+        column = self._columns[key]
+        if isinstance(column, dict):
+            table = column["table"]
+            return [table[code] for code in column["codes"]]
+        return column
@@ -0,0 +1,11 @@
+"""Compares the derived 撫州話 syllables with the recorded ones.
+
+Also counts the syllables of `strata.json` as derived, so run it after
+export_strata.
+"""
+
+from updater import Updater
+
+
+with Updater(mode="ro") as session:
+    session.compare_inventories()
@@ -0,0 +1,123 @@
+"""Writes compressed copies of the generated files for static hosting.
+
+Every JSON and text file under `data/generated` of at least 1 KB gets a `.gz`
+sidecar (gzip level 9, with a zero timestamp so the output is reproducible),
+and a `.br` sidecar too if the `brotli` package is installed. A sidecar newer
+than its source is left alone.
+"""
+
+import argparse
+import gzip
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from env_setup import DATA_PATH
+from output import atomic_write
+from parallel import add_jobs_argument
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+GENERATED_PATH = DATA_PATH / "generated"
+
+SOURCE_SUFFIXES = {".json", ".txt"}
+MIN_SIZE = 1024
+
+COMPRESSORS = {".gz": lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+if brotli is not None:
+    COMPRESSORS[".br"] = lambda data: brotli.compress(data, quality=11)
+
+
+def is_source(path: Path) -> bool:
+    return (
+        path.is_file()
+        and path.suffix in SOURCE_SUFFIXES
+        and not path.name.startswith(".")
+        and path.stat().st_size >= MIN_SIZE
+    )
+
+
+def compress_file(path: Path, force: bool = False) -> dict[str, int]:
+    """Sizes of `path` and each of its sidecars, compressing where outdated."""
+
+    sizes = {"raw": path.stat().st_size}
+    data = None
+    for suffix, compress in COMPRESSORS.items():
+        target = path.with_name(path.name + suffix)
+        if force or not (
+            target.exists() and target.stat().st_mtime >= path.stat().st_mtime
+        ):
+            if data is None:
+                data = path.read_bytes()
+            with atomic_write(target, encoding=None) as f:
+                f.write(compress(data))
+            os.utime(target)  # unchanged output keeps its old mtime otherwise
+        sizes[suffix] = target.stat().st_size
+    return sizes
+
+
+def remove_stale_sidecars() -> list[Path]:
+    """Deletes sidecars whose source is gone or no longer compressed."""
+
+    removed = []
+    for suffix in [".gz", ".br"]:
+        for target in GENERATED_PATH.rglob(f"*{suffix}"):
+            source = target.with_name(target.name.removesuffix(suffix))
+            if suffix not in COMPRESSORS or not (source.exists() and is_source(source)):
+                target.unlink()
+                removed.append(target)
+    return removed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--force", action="store_true", help="重新壓縮所有文件")
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
+    sources = sorted(path for path in GENERATED_PATH.rglob("*") if is_source(path))
+    # zlib and brotli release the GIL, so threads are enough
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        results = list(pool.map(lambda path: compress_file(path, args.force), sources))
+    removed = remove_stale_sidecars()
+
+    # files in subdirectories such as shards/ are reported together
+    groups = defaultdict(lambda: defaultdict(int))
+    for path, sizes in zip(sources, results):
+        relative = path.relative_to(GENERATED_PATH)
+        name = (
+            relative.as_posix() if len(relative.parts) == 1 else f"{relative.parts[0]}/"
+        )
+        groups[name]["files"] += 1
+        for key, size in sizes.items():
+            groups[name][key] += size
+    if groups:
+        total = defaultdict(int)
+        for sizes in list(groups.values()):
+            for key, size in sizes.items():
+                total[key] += size
+        groups["總計"] = total
+    else:
+        print("  沒有需要壓縮的文件")
+
+    for name, sizes in groups.items():
+        line = f"  {name}: {sizes['raw'] / 1024:.0f} KB"
+        for suffix in COMPRESSORS:
+            ratio = sizes[suffix] / sizes["raw"] if sizes["raw"] else 1
+            line += f"，{suffix} {sizes[suffix] / 1024:.0f} KB（{ratio:.0%}）"
+        if sizes["files"] > 1:
+            line += f"，{sizes['files']} 個文件"
+        print(line)
+    if brotli is None:
+        print("  未安裝 brotli，跳過 .br")
+    if removed:
+        print(f"  刪除過時的壓縮文件 {len(removed)} 個")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Checks the syllable parsers against the examples in their docstrings.
+
+    python conformance.py
+
+Prints every example a parser gets wrong and exits with status 1 if there is
+any, so it can run as a CI step. benchmark.py also runs it against each
+checkout it measures.
+"""
+
+import sys
+
+import env_setup  # noqa: F401
+
+
+# Examples from the parser docstrings. Every version of a parser must agree.
+CONFORMANCE = [
+    ("FG", "parse_pinyin", "qiāng", ("tɕʰ", "j", "a", "ŋ", "1")),
+    ("FG", "parse_pinyin", "qiang", ("tɕʰ", "j", "a", "ŋ", "0")),
+    ("FG", "parse_pinyin", "qiang6", ("tɕʰ", "j", "a", "ŋ", "6")),
+    ("FG", "parse_pinyin", "qiāng6", ("tɕʰ", "j", "a", "ŋ", "6")),
+    ("FG", "parse_pinyin", "ńg", ("ŋ", "", "", "", "2")),
+    ("FG", "parse_pinyin", "ng2", ("ŋ", "", "", "", "2")),
+    ("FG", "parse_ipa", "tɕʰjaŋ3", ("tɕʰ", "j", "a", "ŋ", "3")),
+    ("PM", "parse_pinyin", "qiu", ("tɕʰ", "j", "o", "u", "")),
+    ("PM", "parse_pinyin", "qiū", ("tɕʰ", "j", "o", "u", "1")),
+    ("PM", "parse_pinyin", "qiu0", ("tɕʰ", "j", "o", "u", "0")),
+    ("GC", "parse_pinyin", "gwaang2", ("k", "w", "a", "ŋ", "2")),
+    ("GC", "parse_pinyin", "gwaang", ("k", "w", "a", "ŋ", "0")),
+    ("MH", "parse_pinyin", "ngiap6", ("ŋ", "j", "a", "p", "6")),
+    ("MH", "parse_pinyin", "ngiap", ("ŋ", "j", "a", "p", "0")),
+    ("MH", "parse_pinyin", "ngiab6", ValueError),
+    ("VN", "parse_pinyin", "quốc", ("k", "", "uə", "k", "7")),
+    ("VN", "parse_pinyin", "quôc5", ("k", "", "uə", "k", "7")),
+    ("VN", "parse_pinyin", "quôcs", ("k", "", "uə", "k", "7")),
+]
+
+
+def check_conformance(syllable_map) -> list[str]:
+    """The examples that the parsers of syllable_map get wrong."""
+
+    failures = []
+    for lang_en, method, text, expected in CONFORMANCE:
+        try:
+            result = getattr(syllable_map[lang_en], method)(text).tuple
+        except Exception as e:
+            result = type(e)
+        if result != expected:
+            failures.append(f"{lang_en}.{method}({text!r}): {result} != {expected}")
+    return failures
+
+
+def main() -> None:
+    from phonology import SYLLABLE_MAP
+
+    failures = check_conformance(SYLLABLE_MAP)
+    for failure in failures:
+        print(f"不一致：{failure}")
+    if failures:
+        sys.exit(1)
+    print(f"全部 {len(CONFORMANCE)} 個例子一致。")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,5 +4,7 @@ mkdir "app\public\data"
 xcopy "data\generated\*" "app\public\data\" /s /y /i /q >nul
 xcopy "data\manual\*" "app\public\data\" /s /y /i /q >nul
 del /s /q "app\public\data\*.sqlite3" >nul
+del /s /q "app\public\data\*.sqlite3-wal" >nul
+del /s /q "app\public\data\*.sqlite3-shm" >nul
 del /s /q "app\public\data\*.sqbpro" >nul
 echo Copy complete!
\ No newline at end of file
@@ -1,8 +1,13 @@
 """Generates `{lang_en}.json`."""
 
-import json
+import argparse
+from contextlib import ExitStack
+from functools import partial
 
+from columnar import ColumnarWriter
 from env_setup import DATA_PATH
+from output import JSONArrayWriter
+from parallel import add_jobs_argument, parallel_map, split
 from updater import Updater
 from phonology import SYLLABLE_MAP
 
@@ -17,38 +22,85 @@ COLUMNS = [
 ]
 
 
-session = Updater()
-
-for lang_en in SYLLABLE_MAP:
-    lang_cn = SYLLABLE_MAP[lang_en].NAME
-
-    seen = {}
-
-    def to_entry(row: dict) -> dict:
-        # delete 廣韻釋義
-        if "讀音" not in row:
-            row["釋義"] = None
-
-        row["記錄讀音"] = row["讀音"] if "讀音" in row else None
-
-        if row["小韻號"] is not None:
-            if row["字頭"] not in seen:
-                seen[row["字頭"]] = set()
-            seen[row["字頭"]].add(row["小韻號"])
-
-        return {key: row.get(key) for key in COLUMNS}
-
-    session.cursor.execute(f"SELECT * FROM {lang_cn}")
-    dictionary = [to_entry(row) for row in session.data]
-
-    session.cursor.execute("SELECT * FROM 字頭全")
-    for row in session.data:
-        if f"推導{lang_cn}" not in row:
-            break
-        if row["小韻號"] not in seen.get(row["字頭"], set()):
-            dictionary.append(to_entry(row))
-
-    with open(DATA_PATH / "generated" / f"{lang_en}.json", "w", encoding="utf-8") as f:
-        json.dump(dictionary, f, separators=(",", ":"), ensure_ascii=False)
-
-    print(f"導出{lang_cn}字典完成！")
+def to_entry(row: dict) -> dict:
+    entry = {key: row.get(key) for key in COLUMNS}
+    entry["記錄讀音"] = row.get("讀音")
+    if "讀音" not in row:
+        entry["釋義"] = None  # delete 廣韻釋義
+    return entry
+
+
+def export(languages: list[str], columnar: bool = False) -> None:
+    """Exports the given languages with a single scan of 字頭全.
+
+    columnar: 另外導出列式的 `{lang_en}.columns.json`
+    """
+
+    session = Updater(mode="ro")
+
+    with ExitStack() as stack:
+        writers = {
+            lang_en: [
+                stack.enter_context(writer_cls(DATA_PATH / "generated" / filename))
+                for writer_cls, filename in [
+                    (JSONArrayWriter, f"{lang_en}.json"),
+                    (ColumnarWriter, f"{lang_en}.columns.json"),
+                ][: 2 if columnar else 1]
+            ]
+            for lang_en in languages
+        }
+
+        def write(lang_en: str, entry: dict) -> None:
+            for writer in writers[lang_en]:
+                writer.write(entry)
+
+        # (字頭, 小韻號) already covered by a recorded reading, per language
+        seen = {lang_en: set() for lang_en in languages}
+
+        for lang_en in languages:
+            for row in session.iter_rows(SYLLABLE_MAP[lang_en].NAME):
+                if row["小韻號"] is not None:
+                    seen[lang_en].add((row["字頭"], row["小韻號"]))
+                write(lang_en, to_entry(row))
+
+        # 字頭全 is read once and fanned out to every language it has 推導 for;
+        # entries without a recorded reading only keep 字頭 and 小韻號
+        columns = session.columns("字頭全")
+        derived = [
+            lang_en
+            for lang_en in languages
+            if f"推導{SYLLABLE_MAP[lang_en].NAME}" in columns
+        ]
+        if derived:
+            rows = session.iter_rows(
+                "字頭全", ["字頭", "小韻號"], order_by="字頭, 小韻號", record="tuple"
+            )
+            for key in rows:
+                entry = to_entry({"字頭": key[0], "小韻號": key[1]})
+                for lang_en in derived:
+                    if key not in seen[lang_en]:
+                        write(lang_en, entry)
+                        seen[lang_en].add(key)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--columnar", action="store_true", help="另外導出列式的 {lang_en}.columns.json"
+    )
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
+    # one job scans 字頭全 once for all languages; more jobs trade scans for cores
+    parallel_map(
+        partial(export, columnar=args.columnar),
+        split(SYLLABLE_MAP, args.jobs),
+        args.jobs,
+    )
+
+    for lang_en in SYLLABLE_MAP:
+        print(f"導出{SYLLABLE_MAP[lang_en].NAME}字典完成！")
+
+
+if __name__ == "__main__":
+    main()
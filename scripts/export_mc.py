@@ -3,6 +3,7 @@
 import json
 
 from env_setup import DATA_PATH
+from output import atomic_write
 from updater import Updater
 from phonology import SYLLABLE_MAP
 
@@ -29,7 +30,7 @@ def to_mc_entry(row: dict) -> dict:
     return {key: row.get(key) for key in COLUMNS}
 
 
-session = Updater()
+session = Updater(mode="ro")
 
 MC_ENTRY_MAP = {}
 session.cursor.execute("""
@@ -49,7 +50,7 @@ for row in session.data:
     }
 
 
-with open(DATA_PATH / "generated" / "MC.json", "w", encoding="utf-8") as f:
+with atomic_write(DATA_PATH / "generated" / "MC.json") as f:
     json.dump(MC_ENTRY_MAP, f, separators=(",", ":"), ensure_ascii=False)
 
 print("導出廣韻小韻數據完成！")
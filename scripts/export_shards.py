@@ -0,0 +1,98 @@
+"""Generates `shards/`, the dictionaries split by character for lazy loading.
+
+Every 字頭 goes to the shard `ord(字頭[0]) % buckets`, named in hexadecimal
+padded to the width of the largest bucket, e.g. `shards/03f.json`. A shard
+holds the entries of all languages for its characters and the 小韻 records
+they cite:
+
+    {
+        "字頭": {"東": {"FG": [{"記錄讀音": ..., ...}], ...}, ...},
+        "MC": {"1": {"字數": ..., "MC": {...}, "reflex": {...}}, ...}
+    }
+
+`shards/index.json` records the bucket count, the name width and the size of
+every shard. This reads the exported `{lang_en}.json` and `MC.json`, so run it
+after them.
+"""
+
+import argparse
+import json
+from collections import defaultdict
+
+from env_setup import DATA_PATH
+from output import atomic_write
+from phonology import SYLLABLE_MAP
+
+
+GENERATED_PATH = DATA_PATH / "generated"
+SHARDS_PATH = GENERATED_PATH / "shards"
+
+
+def shard_of(字頭: str, buckets: int) -> str:
+    width = len(f"{buckets - 1:x}")
+    return f"{ord(字頭[0]) % buckets:0{width}x}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--buckets", type=int, default=1024, help="分片數（默認 1024）")
+    args = parser.parse_args()
+    if args.buckets < 1:
+        parser.error("--buckets must be positive")
+
+    with open(GENERATED_PATH / "MC.json", "r", encoding="utf-8") as f:
+        mc_entries = json.load(f)
+
+    shards = defaultdict(lambda: {"字頭": defaultdict(dict), "MC": {}})
+    for lang_en in SYLLABLE_MAP:
+        path = GENERATED_PATH / f"{lang_en}.json"
+        if not path.exists():
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        for entry in entries:
+            字頭 = entry.pop("字頭")
+            if not 字頭:
+                continue
+            shard = shards[shard_of(字頭, args.buckets)]
+            shard["字頭"][字頭].setdefault(lang_en, []).append(entry)
+            if (index := str(entry["小韻號"])) in mc_entries:
+                shard["MC"][index] = mc_entries[index]
+
+    SHARDS_PATH.mkdir(exist_ok=True)
+    index = {
+        "buckets": args.buckets,
+        "width": len(shard_of(chr(0), args.buckets)),
+        "shards": {},
+    }
+    for name in sorted(shards):
+        shard = shards[name]
+        shard["MC"] = dict(sorted(shard["MC"].items(), key=lambda item: int(item[0])))
+        path = SHARDS_PATH / f"{name}.json"
+        with atomic_write(path) as f:
+            json.dump(shard, f, separators=(",", ":"), ensure_ascii=False)
+        index["shards"][name] = {
+            "字數": len(shard["字頭"]),
+            "size": path.stat().st_size,
+        }
+
+    # shards left over from a different bucket count
+    for path in SHARDS_PATH.glob("*.json"):
+        if path.stem != "index" and path.stem not in shards:
+            path.unlink()
+
+    with atomic_write(SHARDS_PATH / "index.json") as f:
+        json.dump(index, f, separators=(",", ":"), ensure_ascii=False)
+
+    sizes = [shard["size"] for shard in index["shards"].values()]
+    if not sizes:
+        print("導出分片完成！沒有可導出的字條。")
+        return
+    print(
+        f"導出分片完成！共 {len(sizes)} 片，"
+        f"平均 {sum(sizes) / len(sizes) / 1024:.1f} KB，最大 {max(sizes) / 1024:.1f} KB。"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,42 @@
 """Generates `syllables.json`."""
 
+import argparse
 import json
 
 from env_setup import DATA_PATH
+from output import atomic_write
+from parallel import add_jobs_argument, parallel_map
 from updater import Updater
 from phonology import SYLLABLE_MAP, Syllable
 
 
-session = Updater()
+def collect_syllables(lang_en: str) -> tuple[list[dict], list[str]]:
+    """Syllable rows of one language, and the messages to report."""
 
-
-ALL_SYLLABLES = {}
-
-for lang_en, syllable_cls in SYLLABLE_MAP.items():
+    session = Updater(mode="ro")
+    syllable_cls = SYLLABLE_MAP[lang_en]
     lang_cn = syllable_cls.NAME
+    messages = []
 
     syllables: set[Syllable] = set()
 
-    session.cursor.execute(f"SELECT * FROM {lang_cn}")
-    for row in session.data:
-        syllables.add(syllable_cls.parse_pinyin(row["讀音"]))
-
-    session.cursor.execute("SELECT * FROM 小韻")
-    for row in session.data:
-        if (pron := row.get(f"推導{lang_cn}", None)) is not None:
-            try:
-                syllables.add(syllable_cls.parse_pinyin(pron))
-            except Exception:
-                print(f"Error parsing {lang_cn} {pron}")
+    parsed, _ = syllable_cls.parse_many(
+        pron for (pron,) in session.iter_rows(lang_cn, ["讀音"], record="tuple")
+    )
+    syllables.update(parsed)
+
+    column = f"推導{lang_cn}"
+    derived = (
+        session.iter_rows("小韻", [column], f"{column} IS NOT NULL", record="tuple")
+        if column in session.columns("小韻")
+        else []
+    )
+    parsed, errors = syllable_cls.parse_many(
+        (pron for (pron,) in derived), errors="collect"
+    )
+    syllables.update(syllable for syllable in parsed if syllable is not None)
+    for pron in errors:
+        messages.append(f"Error parsing {lang_cn} {pron}")
 
     if lang_en == "FG":
 
@@ -138,10 +147,26 @@ for lang_en, syllable_cls in SYLLABLE_MAP.items():
                     }
                 )
 
-    ALL_SYLLABLES[lang_en] = rows
+    return rows, messages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
+    ALL_SYLLABLES = {}
+    results = parallel_map(collect_syllables, SYLLABLE_MAP, args.jobs)
+    for lang_en, (rows, messages) in zip(SYLLABLE_MAP, results):
+        for message in messages:
+            print(message)
+        ALL_SYLLABLES[lang_en] = rows
+
+    with atomic_write(DATA_PATH / "generated" / "syllables.json") as f:
+        json.dump(ALL_SYLLABLES, f, separators=(",", ":"), ensure_ascii=False)
 
+    print("導出現代方言音節數據完成！")
 
-with open(DATA_PATH / "generated" / "syllables.json", "w", encoding="utf-8") as f:
-    json.dump(ALL_SYLLABLES, f, separators=(",", ":"), ensure_ascii=False)
 
-print("導出現代方言音節數據完成！")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Generates `manifest.json`, the content hash and size of every generated file."""
+
+import hashlib
+import json
+
+from env_setup import DATA_PATH
+from output import atomic_write
+
+
+GENERATED_PATH = DATA_PATH / "generated"
+MANIFEST_PATH = GENERATED_PATH / "manifest.json"
+
+# files that describe the others, or that change on every run
+EXCLUDED = {"manifest.json", "last-update.txt"}
+# compressed copies written by compress.py
+SIDECAR_SUFFIXES = {".gz", ".br"}
+
+
+def file_digest(path) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def build_manifest() -> dict[str, dict]:
+    manifest = {}
+    for path in sorted(GENERATED_PATH.rglob("*")):
+        if (
+            not path.is_file()
+            or path.name in EXCLUDED
+            or path.name.startswith(".")
+            or path.suffix in SIDECAR_SUFFIXES
+        ):
+            continue
+        manifest[path.relative_to(GENERATED_PATH).as_posix()] = {
+            "sha256": file_digest(path),
+            "size": path.stat().st_size,
+        }
+    return manifest
+
+
+def load_manifest() -> dict[str, dict]:
+    if not MANIFEST_PATH.exists():
+        return {}
+    with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def update_manifest() -> list[str]:
+    """Rewrites `manifest.json` and returns the files added, changed or removed."""
+
+    old, new = load_manifest(), build_manifest()
+    changed = sorted(
+        name for name in old.keys() | new.keys() if old.get(name) != new.get(name)
+    )
+    with atomic_write(MANIFEST_PATH) as f:
+        json.dump(new, f, ensure_ascii=False, indent=2)
+    return changed
+
+
+def main() -> None:
+    changed = update_manifest()
+    print(f"更新文件清單完成！共 {len(changed)} 個文件有變化。")
+    for name in changed:
+        print("  " + name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Versioned schema migrations for hanzi.sqlite3, and a query plan audit.
+
+    python migrations.py            # apply pending migrations, then audit
+    python migrations.py --audit    # only audit
+
+The schema version is stored in `PRAGMA user_version`; migration `n` (counting
+from 1) brings the database from version `n - 1` to `n`. Every migration runs
+in its own transaction together with the version bump.
+
+The audit runs `EXPLAIN QUERY PLAN` on the queries the scripts run most and
+flags full table scans, except where reading the whole table is the point, and
+automatic indexes, which SQLite builds anew every time the query runs.
+"""
+
+import argparse
+import sqlite3
+from typing import Callable
+
+from updater import Updater
+from phonology import SYLLABLE_MAP
+
+
+DIALECT_TABLES = [SYLLABLE_MAP[lang_en].NAME for lang_en in SYLLABLE_MAP]
+
+
+def add_lookup_indexes(cursor: sqlite3.Cursor) -> None:
+    """Indexes for lookups by 字頭, and by 小韻號."""
+    for table in [*DIALECT_TABLES, "字頭"]:
+        cursor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{table}_字頭_小韻號" ON "{table}" (字頭, 小韻號)'
+        )
+        cursor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{table}_小韻號" ON "{table}" (小韻號)'
+        )
+    cursor.execute("ANALYZE")
+
+
+MIGRATIONS: list[Callable[[sqlite3.Cursor], None]] = [
+    add_lookup_indexes,
+]
+
+
+def schema_version(session: Updater) -> int:
+    return session.cursor.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(session: Updater) -> list[str]:
+    """Applies pending migrations and returns their descriptions."""
+
+    applied = []
+    for version, migration in enumerate(MIGRATIONS, start=1):
+        if schema_version(session) >= version:
+            continue
+        with session.transaction() as cursor:
+            migration(cursor)
+            cursor.execute(f"PRAGMA user_version = {version}")
+        applied.append(f"{version}: {migration.__doc__}")
+    return applied
+
+
+# (description, query, parameters, tables that are meant to be read in full)
+HOT_QUERIES = [
+    *[
+        (
+            f"按字頭查{table}",
+            f"SELECT rowid, * FROM {table} WHERE 字頭 = ?",
+            ("東",),
+            set(),
+        )
+        for table in DIALECT_TABLES
+    ],
+    ("按字頭查廣韻", "SELECT * FROM 字頭全 WHERE 字頭 = ?", ("東",), set()),
+    (
+        "導出字典",
+        "SELECT 字頭, 小韻號 FROM 字頭全 ORDER BY 字頭, 小韻號",
+        (),
+        {"字頭"},
+    ),
+    (
+        "update_reflex 寫入",
+        "UPDATE 小韻 SET 推導撫州話 = ? WHERE 小韻號 = ?",
+        ("dung1", 1),
+        set(),
+    ),
+    (
+        "export_mc 統計字數",
+        """
+        SELECT 小韻全.*, COUNT(*) AS 字數
+        FROM 小韻全
+        LEFT JOIN 字頭 ON 小韻全.小韻號 = 字頭.小韻號
+        GROUP BY 小韻全.小韻號
+        """,
+        (),
+        {"小韻"},
+    ),
+]
+
+
+def audit(session: Updater) -> list[tuple[str, list[str], list[str]]]:
+    """Query plans of HOT_QUERIES: (description, plan, flagged steps)."""
+
+    report = []
+    for description, query, params, full_reads in HOT_QUERIES:
+        rows = session.cursor.execute(f"EXPLAIN QUERY PLAN {query}", params)
+        plan = [row[3] for row in rows.fetchall()]
+        flagged = [
+            step
+            for step in plan
+            if (step.startswith("SCAN ") and step.split()[1] not in full_reads)
+            or "AUTOMATIC" in step.split()
+        ]
+        report.append((description, plan, flagged))
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--audit", action="store_true", help="只檢查查詢計劃")
+    args = parser.parse_args()
+
+    session = Updater(mode="ro" if args.audit else "rw")
+
+    if not args.audit:
+        for item in migrate(session):
+            print(f"已遷移 {item}")
+    print(f"數據庫版本：{schema_version(session)} / {len(MIGRATIONS)}")
+
+    flagged_count = 0
+    for description, plan, flagged in audit(session):
+        mark = "全表掃描或臨時索引！" if flagged else "OK"
+        print(f"[{mark}] {description}")
+        for step in plan:
+            print(f"    {'*' if step in flagged else ' '} {step}")
+        flagged_count += bool(flagged)
+    print(f"共 {flagged_count} 個查詢有全表掃描或臨時索引。")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Writers for generated files that never leave a partial file behind."""
+
+import filecmp
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, Iterator, TextIO
+
+
+@contextmanager
+def atomic_write(
+    path: Path, encoding: str | None = "utf-8"
+) -> Iterator[TextIO | BinaryIO]:
+    """Opens a temporary file next to `path` and renames it over `path` on success.
+
+    If the block raises, the temporary file is removed and `path` is untouched.
+    If the new content is identical to `path`, `path` is left alone as well, so
+    its modification time only moves when the content does.
+
+    With `encoding=None` the file is opened in binary mode.
+    """
+
+    path = Path(path)
+    fd, temp_name = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        # wrap the descriptor first, so that it is closed whatever fails next
+        if encoding is None:
+            f = os.fdopen(fd, "wb")
+        else:
+            f = os.fdopen(fd, "w", encoding=encoding, newline="")
+        with f:
+            # mkstemp creates the file as private; keep the permissions of `path`
+            os.chmod(temp_name, path.stat().st_mode if path.exists() else 0o644)
+            yield f
+        if path.exists() and filecmp.cmp(temp_name, path, shallow=False):
+            os.unlink(temp_name)
+        else:
+            os.replace(temp_name, path)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+
+
+class JSONArrayWriter:
+    """Writes a JSON array one item at a time, atomically.
+
+    The output is identical to `json.dump(items, f, separators=(",", ":"),
+    ensure_ascii=False)`, but the items never have to be in memory together.
+
+        with JSONArrayWriter(path) as writer:
+            for row in rows:
+                writer.write(row)
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.count = 0
+        self._encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+    def __enter__(self) -> "JSONArrayWriter":
+        self._context = atomic_write(self.path)
+        self._file = self._context.__enter__()
+        self._file.write("[")
+        return self
+
+    def __exit__(self, *exc_info) -> bool | None:
+        if exc_info[0] is None:
+            self._file.write("]")
+        return self._context.__exit__(*exc_info)
+
+    def write(self, item: Any) -> None:
+        if self.count:
+            self._file.write(",")
+        self._file.write(self._encoder.encode(item))
+        self.count += 1
+
+    def write_all(self, items: Iterable[Any]) -> None:
+        for item in items:
+            self.write(item)
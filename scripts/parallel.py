@@ -0,0 +1,45 @@
+"""Runs independent per-language work in a process pool."""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, TypeVar
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def add_jobs_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        metavar="N",
+        help="同時處理的進程數（默認 1，即不開子進程）",
+    )
+
+
+def parallel_map(
+    function: Callable[[T], R], items: Iterable[T], jobs: int = 1
+) -> list[R]:
+    """Applies `function` to every item, in up to `jobs` processes.
+
+    Results come back in the order of `items`, so reports built from them are
+    stable however the work is scheduled. `function` must be defined at module
+    level, and the calling script must guard its entry point with
+    `if __name__ == "__main__"`, as workers re-import it on Windows.
+    """
+
+    items = list(items)
+    if jobs <= 1 or len(items) <= 1:
+        return [function(item) for item in items]
+    with ProcessPoolExecutor(max_workers=min(jobs, len(items))) as pool:
+        return list(pool.map(function, items))
+
+
+def split(items: Iterable[T], parts: int) -> list[list[T]]:
+    """Deals `items` round-robin into at most `parts` non-empty groups."""
+    items = list(items)
+    parts = max(1, min(parts, len(items)))
+    return [items[i::parts] for i in range(parts)]
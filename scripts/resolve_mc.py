@@ -0,0 +1,63 @@
+"""Assigns 小韻號 to dialect entries that lack one, where the choice is clear.
+
+A row is resolved automatically when exactly one 廣韻 entry of its character
+matches best, either by derived reading or by Middle Chinese tone, and it is
+not a 訓讀 entry. The remaining rows are listed with their ranked candidates,
+to be assigned with `Updater.add_mc_index`.
+"""
+
+import argparse
+
+from updater import Updater
+from phonology import SYLLABLE_MAP
+
+
+def main() -> None:
+    # 只有字頭全中有推導音的語言才能排列候選
+    with Updater(mode="ro") as session:
+        columns = session.columns("字頭全")
+    langs = [
+        lang_en
+        for lang_en, syllable_cls in SYLLABLE_MAP.items()
+        if f"推導{syllable_cls.NAME}" in columns
+    ]
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lang", choices=langs, default="FG")
+    parser.add_argument("--dry-run", action="store_true", help="只顯示結果，不寫入")
+    args = parser.parse_args()
+
+    mode = "ro" if args.dry_run else "rw"
+    with Updater(lang_en=args.lang, mode=mode) as session:
+        resolutions = session.resolve_mc_indexes(apply=not args.dry_run)
+
+        resolved = [resolution for resolution in resolutions if resolution.unambiguous]
+        pending = [
+            resolution for resolution in resolutions if not resolution.unambiguous
+        ]
+        verb = "可自動添加" if args.dry_run else "已自動添加"
+        print(
+            f"{session.lang_cn}缺小韻號的字條共 {len(resolutions)} 條，"
+            f"{verb} {len(resolved)} 條，待人工選擇 {len(pending)} 條。"
+        )
+        for resolution in resolved:
+            row, best = resolution.row, resolution.best
+            print(
+                f"  {row['字頭']} {row['讀音']} -> {best.entry['小韻號']} "
+                f"{best.entry['音韻地位']}（{best.match}，{best.confidence:.0%}）"
+            )
+
+        print("待人工選擇：")
+        for resolution in pending:
+            row = resolution.row
+            candidates = "；".join(
+                f"{candidate.entry['小韻號']} "
+                f"{candidate.entry[f'推導{session.lang_cn}']} "
+                f"{candidate.confidence:.0%}"
+                for candidate in resolution.candidates
+            )
+            print(f"  {row['字頭']} {row['讀音']}: {candidates or '廣韻未收錄'}")
+
+
+if __name__ == "__main__":
+    main()
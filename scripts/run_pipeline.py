@@ -0,0 +1,452 @@
+"""Runs the update pipeline, skipping stages whose inputs have not changed.
+
+    python run_pipeline.py                    # every stage that needs it
+    python run_pipeline.py export_lang        # only the named stages
+    python run_pipeline.py --force --jobs 4
+    python run_pipeline.py --dry-run
+
+Each stage declares what it reads and writes: files as glob patterns relative
+to the repository, and database tables as `table:名`. A stage depends on every
+stage that writes something it reads, and independent stages run at the same
+time. Stages that write tables run one at a time, as SQLite allows a single
+writer.
+
+A stage is skipped when the fingerprints of its inputs and outputs are the
+same as after its last successful run. Fingerprints are content hashes, kept
+in `data/.pipeline-state.json`.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from env_setup import DATA_PATH
+from output import atomic_write
+from updater import Updater
+from phonology import SYLLABLE_MAP
+
+
+ROOT = DATA_PATH.parent
+STATE_PATH = DATA_PATH / ".pipeline-state.json"
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    run: list[str] | Callable[[], str]  # command, or function returning its report
+    inputs: list[str]
+    outputs: list[str]
+
+    @property
+    def writes_tables(self) -> bool:
+        return any(output.startswith("table:") for output in self.outputs)
+
+
+def python(script: str, *args: str) -> list[str]:
+    return [sys.executable, str(ROOT / "scripts" / script), *args]
+
+
+def copy_data() -> str:
+    """Python version of `copy-data.bat`."""
+
+    target = ROOT / "app" / "public" / "data"
+    shutil.rmtree(target, ignore_errors=True)
+    shutil.copytree(DATA_PATH / "generated", target)
+    shutil.copytree(
+        DATA_PATH / "manual",
+        target,
+        dirs_exist_ok=True,
+        ignore=shutil.ignore_patterns(
+            "*.sqlite3", "*.sqlite3-wal", "*.sqlite3-shm", "*.sqbpro", ".*"
+        ),
+    )
+    return "Copy complete!"
+
+
+def build_stages(jobs: int) -> list[Stage]:
+    jobs_args = ("--jobs", str(jobs))
+    phonology = ["shared/python/phonology/*.py"]
+    scripts = [
+        "scripts/env_setup.py",
+        "scripts/updater.py",
+        "scripts/output.py",
+        "scripts/parallel.py",
+    ]
+    dialect_tables = [f"table:{SYLLABLE_MAP[lang_en].NAME}" for lang_en in SYLLABLE_MAP]
+    dialect_json = [f"data/generated/{lang_en}.json" for lang_en in SYLLABLE_MAP]
+    generated = ["data/generated/**/*.json", "data/generated/**/*.txt"]
+
+    return [
+        Stage(
+            "conformance",
+            python("conformance.py"),
+            ["scripts/conformance.py", "scripts/env_setup.py", *phonology],
+            [],
+        ),
+        Stage(
+            "update_reflex",
+            python("update_reflex.py"),
+            [
+                "scripts/update_reflex.py",
+                *scripts,
+                *phonology,
+                "shared/python/predict/*.py",
+                "table:小韻",
+            ],
+            ["table:小韻"],
+        ),
+        Stage(
+            "update_ipa",
+            python("update_ipa.py", *jobs_args),
+            ["scripts/update_ipa.py", *scripts, *phonology, *dialect_tables],
+            dialect_tables,
+        ),
+        Stage(
+            "export_syllables",
+            python("export_syllables.py", *jobs_args),
+            [
+                "scripts/export_syllables.py",
+                *scripts,
+                *phonology,
+                *dialect_tables,
+                "table:小韻",
+            ],
+            ["data/generated/syllables.json"],
+        ),
+        Stage(
+            "export_mc",
+            python("export_mc.py"),
+            ["scripts/export_mc.py", *scripts, "table:小韻", "table:字頭"],
+            ["data/generated/MC.json"],
+        ),
+        Stage(
+            "export_strata",
+            [shutil.which("npx") or "npx", "tsx", "scripts/export_strata.ts"],
+            [
+                "scripts/export_strata.ts",
+                "shared/typescript/**/*.ts",
+                "data/generated/MC.json",
+            ],
+            ["data/generated/strata.json"],
+        ),
+        Stage(
+            "compare_inventories",
+            python("compare_inventories.py"),
+            [
+                "scripts/compare_inventories.py",
+                *scripts,
+                "table:小韻",
+                f"table:{SYLLABLE_MAP['FG'].NAME}",
+                "data/generated/strata.json",
+            ],
+            [],
+        ),
+        Stage(
+            "export_lang",
+            python("export_lang.py", *jobs_args),
+            [
+                "scripts/export_lang.py",
+                "scripts/columnar.py",
+                *scripts,
+                *phonology,
+                *dialect_tables,
+                "table:小韻",
+                "table:字頭",
+            ],
+            dialect_json,
+        ),
+        Stage(
+            "export_shards",
+            python("export_shards.py"),
+            [
+                "scripts/export_shards.py",
+                *phonology,
+                *dialect_json,
+                "data/generated/MC.json",
+            ],
+            ["data/generated/shards/*.json"],
+        ),
+        Stage(
+            "update_date",
+            python("update_date.py"),
+            ["scripts/update_date.py", "scripts/manifest.py", *generated],
+            ["data/generated/manifest.json", "data/generated/last-update.txt"],
+        ),
+        Stage(
+            "compress",
+            python("compress.py", *jobs_args),
+            ["scripts/compress.py", *generated],
+            ["data/generated/**/*.gz", "data/generated/**/*.br"],
+        ),
+        Stage(
+            "copy_data",
+            copy_data,
+            ["data/generated/**/*", "data/manual/**/*.json", "data/manual/**/*.yaml"],
+            ["app/public/data/**/*"],
+        ),
+    ]
+
+
+def pattern_regex(pattern: str) -> re.Pattern:
+    """Glob pattern as a regex, where `**/` matches any number of directories."""
+    regex = ""
+    for token in re.split(r"(\*\*/|\*|\?)", pattern):
+        match token:
+            case "**/":
+                regex += "(?:.*/)?"
+            case "*":
+                regex += "[^/]*"
+            case "?":
+                regex += "[^/]"
+            case _:
+                regex += re.escape(token)
+    return re.compile(regex + r"\Z")
+
+
+def overlaps(first: str, second: str) -> bool:
+    """Whether two resources may refer to the same thing."""
+    return (
+        first == second
+        or pattern_regex(first).match(second) is not None
+        or pattern_regex(second).match(first) is not None
+    )
+
+
+def dependencies(stages: list[Stage]) -> dict[str, set[str]]:
+    """Stages that must finish before each stage, i.e. those writing its inputs."""
+
+    deps = {
+        stage.name: {
+            other.name
+            for other in stages
+            if other is not stage
+            and any(
+                overlaps(output, input_)
+                for output in other.outputs
+                for input_ in stage.inputs
+            )
+        }
+        for stage in stages
+    }
+
+    # reject cycles, which would otherwise wait forever
+    done = set()
+    while len(done) < len(deps):
+        ready = {
+            name for name, needs in deps.items() if name not in done and needs <= done
+        }
+        if not ready:
+            raise ValueError(f"Cyclic stages: {sorted(deps.keys() - done)}")
+        done |= ready
+    return deps
+
+
+class Fingerprints:
+    """Content hashes of files and tables, reused within a run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._files: dict[Path, tuple[int, int, str]] = {}
+        self._tables: dict[str, str] = {}
+
+    def file(self, path: Path) -> str:
+        stat = path.stat()
+        with self._lock:
+            cached = self._files.get(path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        sha256 = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                sha256.update(chunk)
+        with self._lock:
+            self._files[path] = (stat.st_mtime_ns, stat.st_size, sha256.hexdigest())
+        return sha256.hexdigest()
+
+    def table(self, name: str) -> str:
+        with self._lock:
+            cached = self._tables.get(name)
+        if cached is None:
+            # connections cannot be shared between threads
+            cached = Updater(mode="ro").table_checksum(name)
+            with self._lock:
+                self._tables[name] = cached
+        return cached
+
+    def forget_tables(self, names: list[str]) -> None:
+        with self._lock:
+            for name in names:
+                self._tables.pop(name.removeprefix("table:"), None)
+
+    def resource(self, resource: str) -> str:
+        if resource.startswith("table:"):
+            return self.table(resource.removeprefix("table:"))
+        sha256 = hashlib.sha256()
+        for path in sorted(ROOT.glob(resource)):
+            if path.is_file() and not path.name.startswith("."):
+                relative = path.relative_to(ROOT).as_posix()
+                sha256.update(f"{relative}:{self.file(path)}\n".encode("utf-8"))
+        return sha256.hexdigest()
+
+    def stage(self, stage: Stage) -> dict[str, dict[str, str]]:
+        return {
+            "inputs": {resource: self.resource(resource) for resource in stage.inputs},
+            "outputs": {
+                resource: self.resource(resource) for resource in stage.outputs
+            },
+        }
+
+
+class Runner:
+    def __init__(self, stages: list[Stage], force: bool = False, dry_run: bool = False):
+        self.stages = stages
+        self.force = force
+        self.dry_run = dry_run
+        self.fingerprints = Fingerprints()
+        self.state = (
+            json.loads(STATE_PATH.read_text("utf-8")) if STATE_PATH.exists() else {}
+        )
+        self._state_lock = threading.Lock()
+        self._table_lock = threading.Lock()
+
+    def save_state(self, name: str, fingerprint: dict) -> None:
+        with self._state_lock:
+            self.state[name] = fingerprint
+            with atomic_write(STATE_PATH) as f:
+                json.dump(self.state, f, ensure_ascii=False, indent=2)
+
+    def execute(self, stage: Stage, upstream_pending: bool) -> tuple[str, str, float]:
+        """Runs one stage if needed: its status, captured output and duration."""
+        start = time.perf_counter()
+        status, output = self._execute(stage, upstream_pending)
+        return status, output, time.perf_counter() - start
+
+    def _execute(self, stage: Stage, upstream_pending: bool) -> tuple[str, str]:
+        if not self.force and not upstream_pending:
+            if self.state.get(stage.name) == self.fingerprints.stage(stage):
+                return "跳過", ""
+        if self.dry_run:
+            return "需運行", ""
+
+        if stage.writes_tables:
+            self._table_lock.acquire()
+        try:
+            if callable(stage.run):
+                output = stage.run()
+            else:
+                result = subprocess.run(
+                    stage.run,
+                    cwd=ROOT,
+                    capture_output=True,
+                    text=True,
+                    encoding="utf-8",
+                    errors="replace",
+                    env={**os.environ, "PYTHONIOENCODING": "utf-8"},
+                )
+                output = result.stdout + result.stderr
+                if result.returncode != 0:
+                    return f"失敗（返回 {result.returncode}）", output
+        except Exception as e:
+            return f"失敗（{type(e).__name__}: {e}）", ""
+        finally:
+            if stage.writes_tables:
+                self.fingerprints.forget_tables(stage.outputs)
+                self._table_lock.release()
+
+        # recorded after the run, as some stages also read what they write
+        self.save_state(stage.name, self.fingerprints.stage(stage))
+        return "完成", output
+
+    def run(self, jobs: int) -> bool:
+        deps = dependencies(self.stages)
+        names = {stage.name for stage in self.stages}
+        statuses: dict[str, str] = {}
+        timings: dict[str, float] = {}
+        pending = list(self.stages)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+            while pending or running:
+                for stage in list(pending):
+                    needs = deps[stage.name] & names
+                    if not needs <= statuses.keys():
+                        continue
+                    pending.remove(stage)
+                    failed = [
+                        name for name in needs if statuses[name].startswith("失敗")
+                    ]
+                    if failed or any(statuses[name] == "未運行" for name in needs):
+                        statuses[stage.name] = "未運行"
+                        print(f"[{stage.name}] 未運行：依賴的階段失敗")
+                        continue
+                    # in a dry run, stages after one that would run may run too
+                    upstream = any(statuses[name] == "需運行" for name in needs)
+                    future = pool.submit(self.execute, stage, upstream)
+                    running[future] = stage
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    stage = running.pop(future)
+                    status, output, timings[stage.name] = future.result()
+                    statuses[stage.name] = status
+                    print(f"[{stage.name}] {status}，{timings[stage.name]:.1f} s")
+                    for line in output.rstrip().splitlines():
+                        print("  " + line)
+
+        print("-----")
+        for stage in self.stages:
+            timing = (
+                f"{timings[stage.name]:6.1f} s" if stage.name in timings else " " * 8
+            )
+            print(f"{timing}  {stage.name}：{statuses[stage.name]}")
+        return not any(
+            status.startswith(("失敗", "未運行")) for status in statuses.values()
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("stages", nargs="*", help="只運行這些階段（默認全部）")
+    parser.add_argument("--force", action="store_true", help="不論輸入是否變化都運行")
+    parser.add_argument("--dry-run", action="store_true", help="只列出需要運行的階段")
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=os.cpu_count() or 1, metavar="N"
+    )
+    parser.add_argument("--list", action="store_true", help="列出所有階段及其依賴")
+    args = parser.parse_args()
+
+    stages = build_stages(args.jobs)
+    if args.list:
+        for name, needs in dependencies(stages).items():
+            print(f"{name} <- {', '.join(sorted(needs)) or '-'}")
+        return
+
+    if args.stages:
+        unknown = set(args.stages) - {stage.name for stage in stages}
+        if unknown:
+            parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+        stages = [stage for stage in stages if stage.name in args.stages]
+
+    if not (DATA_PATH / "manual" / "hanzi.sqlite3").exists():
+        sys.exit("找不到 data/manual/hanzi.sqlite3")
+
+    runner = Runner(stages, force=args.force, dry_run=args.dry_run)
+    if not runner.run(args.jobs):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
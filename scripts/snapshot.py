@@ -0,0 +1,131 @@
+"""On-disk snapshots of lookup tables built from hanzi.sqlite3.
+
+A snapshot is a pickled value together with the key it was built under: the
+size and modification time of the database (and of its WAL file), and the
+checksums of the tables the value is read from. Loading a snapshot
+
+1. returns it directly if the database files have not changed at all;
+2. otherwise compares the checksums of its tables, and returns it if they still
+   match, so that writes to unrelated tables do not force a rebuild;
+3. otherwise rebuilds the value and saves a new snapshot.
+
+Snapshots live in `data/.cache`, which is not tracked; deleting it is safe.
+"""
+
+import hashlib
+import pickle
+import re
+import sqlite3
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from env_setup import DATA_PATH
+from output import atomic_write
+
+
+CACHE_PATH = DATA_PATH / ".cache"
+FORMAT_VERSION = 1
+
+
+def table_checksum(conn: sqlite3.Connection, table: str) -> str:
+    """表內容的哈希值，內容不變則不變"""
+
+    sha256 = hashlib.sha256()
+    cursor = conn.execute(f"SELECT * FROM {table}")
+    sha256.update(repr([column for column, *_ in cursor.description]).encode())
+    for row in cursor:
+        sha256.update(repr(tuple(row)).encode("utf-8"))
+    return sha256.hexdigest()
+
+
+def source_tables(conn: sqlite3.Connection, name: str) -> set[str]:
+    """The tables a table or view reads from, following views recursively."""
+
+    schema = dict(
+        conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'view'")
+    )
+    tables = {
+        table
+        for (table,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+        )
+    }
+
+    sources, pending = set(), [name]
+    while pending:
+        name = pending.pop()
+        if name in tables:
+            sources.add(name)
+        elif name in schema:
+            tokens = set(re.findall(r"\w+", schema.pop(name)))
+            pending.extend(tokens & (tables | schema.keys()))
+    return sources
+
+
+def database_stat(path: Path) -> tuple:
+    """Sizes and modification times of the database and its WAL file."""
+    return tuple(
+        (file.stat().st_size, file.stat().st_mtime_ns) if file.exists() else None
+        for file in [path, path.with_name(path.name + "-wal")]
+    )
+
+
+class Snapshots:
+    """Snapshots of values built from one database.
+
+    snapshots.load("小韻全", ["小韻全"], build)
+    """
+
+    def __init__(self, conn: sqlite3.Connection, database: Path):
+        self.conn = conn
+        self.database = database
+
+    def path(self, name: str) -> Path:
+        return CACHE_PATH / f"{self.database.stem}.{name}.pickle"
+
+    def load(self, name: str, sources: Iterable[str], build: Callable[[], Any]) -> Any:
+        """The value saved as `name`, or `build()` if any of `sources` changed."""
+
+        if self.conn.in_transaction:
+            # 未提交的修改不一定已寫入文件，也可能回滾，不讀寫快照
+            return build()
+
+        path = self.path(name)
+        stat = database_stat(self.database)
+        tables = set().union(*(source_tables(self.conn, source) for source in sources))
+
+        if path.exists():
+            try:
+                with open(path, "rb") as f:
+                    header = pickle.load(f)
+                    if header["version"] == FORMAT_VERSION:
+                        if header["stat"] == stat:
+                            return pickle.load(f)
+                        if self.unchanged(header["checksums"], tables):
+                            value = pickle.load(f)
+                            self.save(path, {**header, "stat": stat}, value)
+                            return value
+            except (OSError, EOFError, KeyError, pickle.UnpicklingError):
+                pass  # 快照損壞則重建
+
+        value = build()
+        checksums = {table: table_checksum(self.conn, table) for table in tables}
+        self.save(
+            path,
+            {"version": FORMAT_VERSION, "stat": stat, "checksums": checksums},
+            value,
+        )
+        return value
+
+    def unchanged(self, checksums: dict[str, str], tables: set[str]) -> bool:
+        return checksums.keys() == tables and all(
+            table_checksum(self.conn, table) == checksum
+            for table, checksum in checksums.items()
+        )
+
+    @staticmethod
+    def save(path: Path, header: dict, value: Any) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(path, encoding=None) as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
@@ -1,12 +1,24 @@
-"""Updates `last-update.txt`."""
+"""Updates `manifest.json`, and `last-update.txt` if any generated file changed."""
 
 from datetime import date
 
 from env_setup import DATA_PATH
+from manifest import update_manifest
+from output import atomic_write
 
 
-today = date.today()
-formatted = f"{today.year} 年 {today.month} 月 {today.day} 日"
+LAST_UPDATE_PATH = DATA_PATH / "generated" / "last-update.txt"
 
-with open(DATA_PATH / "generated" / "last-update.txt", "w", encoding="utf-8") as f:
-    f.write(formatted)
+
+changed = update_manifest()
+
+if changed or not LAST_UPDATE_PATH.exists():
+    today = date.today()
+    formatted = f"{today.year} 年 {today.month} 月 {today.day} 日"
+
+    with atomic_write(LAST_UPDATE_PATH) as f:
+        f.write(formatted)
+
+    print(f"共 {len(changed)} 個文件有變化，更新日期爲 {formatted}。")
+else:
+    print("生成文件均無變化，不更新日期。")
@@ -1,45 +1,85 @@
 """Updates parts parsed from pinyin in hanzi.sqlite3."""
 
+import argparse
+
+from parallel import add_jobs_argument, parallel_map
 from updater import Updater
 from phonology import SYLLABLE_MAP
 
 
-session = Updater()
-
-for lang_en, syllable_cls in SYLLABLE_MAP.items():
-    lang_cn = syllable_cls.NAME
+def collect_changes(lang_en: str) -> tuple[list[tuple], list[str]]:
+    """Rows whose stored parts differ from their parsed 讀音, as UPDATE parameters."""
 
+    session = Updater(mode="ro")
+    syllable_cls = SYLLABLE_MAP[lang_en]
     has_tone = lang_en not in ["JP", "KR"]
 
-    updated, seen = [], set()
+    changes, updated, seen = [], [], set()
 
-    session.cursor.execute(f"SELECT rowid, * FROM {lang_cn}")
-    for row in session.data:
-        syllable = syllable_cls.parse_pinyin(row["讀音"])
+    parts = ["聲母", "介音", "韻腹", "韻尾", "聲調"][: 5 if has_tone else 4]
+    rows = list(
+        session.iter_rows(syllable_cls.NAME, ["rowid", "讀音", *parts], record="tuple")
+    )
+    syllables, _ = syllable_cls.parse_many(row[1] for row in rows)
+    for (rowid, 讀音, *old), syllable in zip(rows, syllables):
         new = syllable.tuple
-        old = (row["聲母"], row["介音"], row["韻腹"], row["韻尾"])
-        if has_tone:
-            old = (*old, row["聲調"])
+        old = tuple(old)
         if new != old and not (
             # 普通話入聲不確定聲調
             lang_en == "PM"
-            and new[:4] == (row["聲母"], row["介音"], row["韻腹"], row["韻尾"])
+            and new[:4] == old[:4]
             and new[-1] == ""
-            and row["聲調"] == "0"
+            and old[-1] == "0"
         ):
-            session.cursor.execute(
-                f"UPDATE {lang_cn} SET 聲母 = ?, 介音 = ?, 韻腹 = ?, 韻尾 = ? WHERE rowid = ?",
-                (*new[:4], row["rowid"]),
-            )
-            if has_tone:
-                session.cursor.execute(
-                    f"UPDATE {lang_cn} SET 聲調 = ? WHERE rowid = ?",
-                    (*new[4], row["rowid"]),
-                )
+            changes.append((*new, rowid))
             if new not in seen:
-                updated.append(f"{row['讀音']}: {old} -> {new}")
+                updated.append(f"{讀音}: {old} -> {new}")
                 seen.add(new)
 
-    print(f"更新{lang_cn}音標完成！共更新 {len(updated)} 個音節。")
-    for item in updated:
-        print("  " + item)
+    return changes, updated
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lang", choices=list(SYLLABLE_MAP), help="只更新該方言")
+    parser.add_argument("--dry-run", action="store_true", help="只顯示差異，不寫入")
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
+    languages = [args.lang] if args.lang else list(SYLLABLE_MAP)
+    results = parallel_map(collect_changes, languages, args.jobs)
+
+    # 子進程只負責比較，由主進程統一寫入
+    pending = {}
+    for lang_en, (changes, updated) in zip(languages, results):
+        lang_cn = SYLLABLE_MAP[lang_en].NAME
+        pending[lang_en] = changes
+
+        verb = "需更新" if args.dry_run else "共更新"
+        print(
+            f"比較{lang_cn}音標完成！{verb} {len(changes)} 行，{len(updated)} 個音節。"
+        )
+        for item in updated:
+            print("  " + item)
+
+    if args.dry_run:
+        return
+
+    session = Updater()
+    # 所有方言在同一事務中寫入，中途出錯則全部回滾
+    with session.transaction(*(SYLLABLE_MAP[lang_en].NAME for lang_en in pending)):
+        for lang_en, changes in pending.items():
+            columns = ["聲母", "介音", "韻腹", "韻尾"]
+            if lang_en not in ["JP", "KR"]:
+                columns.append("聲調")
+            session.cursor.executemany(
+                f"UPDATE {SYLLABLE_MAP[lang_en].NAME} "
+                f"SET {', '.join(f'{column} = ?' for column in columns)} "
+                "WHERE rowid = ?",
+                changes,
+            )
+    print(f"已寫入 {sum(len(changes) for changes in pending.values())} 行。")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,5 @@ LATER other langs
 from updater import Updater
 
 
-session = Updater()
-session.update_reflex()
-session.compare_inventories()
-del session
+with Updater() as session:
+    session.update_reflex()
@@ -2,57 +2,293 @@
 
 import sqlite3
 import json
-import questionary
-from collections import defaultdict
-from functools import cached_property
-from typing import Any
+import time
+from collections import OrderedDict, defaultdict, namedtuple
+from contextlib import contextmanager
+from functools import cache
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, Sequence
 
 from env_setup import DATA_PATH
-from phonology import SYLLABLE_MAP, FGSyllable
+from snapshot import Snapshots, source_tables, table_checksum
+from phonology import SYLLABLE_MAP
 from predict import REFLEX_GETTER_MAP
 
 
+PRAGMAS = [
+    "mmap_size = 268435456",  # 256 MiB
+    "cache_size = -65536",  # 64 MiB
+    "busy_timeout = 5000",
+]
+
+# 按字查詢廣韻字條時緩存的字數
+MC_ENTRIES_SIZE = 1024
+
+
+# 候選廣韻字條的權重，按其推導音與收錄音的關係；"" 也用作“以上都不對”的權重
+MATCH_WEIGHTS = {"推導音": 1.0, "調類": 0.3, "": 0.05}
+
+
+class MCCandidate(NamedTuple):
+    entry: dict[str, Any]  # 字頭全中的一行
+    match: str  # "推導音" 推導音相同；"調類" 中古調類相同；"" 都不同
+    confidence: float
+
+
+class MCResolution(NamedTuple):
+    row: dict[str, Any]  # rowid, 字頭, 讀音, 訓作
+    candidates: list[MCCandidate]  # 按 confidence 從高到低
+
+    @property
+    def best(self) -> MCCandidate | None:
+        return self.candidates[0] if self.candidates else None
+
+    @property
+    def unambiguous(self) -> bool:
+        """最吻合的候選只有一個，且至少調類相同；訓讀字條不自動處理"""
+        return (
+            self.best is not None
+            and self.best.match != ""
+            and self.row["訓作"] is None
+            and [candidate.match for candidate in self.candidates].count(
+                self.best.match
+            )
+            == 1
+        )
+
+
+@cache
+def record_type(columns: tuple[str, ...]) -> type:
+    """輕量的行記錄類型，按列名訪問且不帶 `__dict__`"""
+    return namedtuple("Record", columns, rename=True)
+
+
 class Updater:
     def __init__(
         self,
         db_name: str = "hanzi.sqlite3",
         lang_en: str = "FG",
+        mode: str = "rw",
     ):
-        self._conn = sqlite3.connect(DATA_PATH / "manual" / db_name)
+        """連接數據庫
+
+        mode: "rw" 讀寫，使用 WAL 日誌；"ro" 只讀，供導出腳本及並行的子進程使用
+            注意 journal_mode = WAL 會永久寫入數據庫文件，以 "rw" 打開一次
+            （即使只讀取，如 --dry-run）之後，該文件便一直處於 WAL 模式
+        """
+
+        path = DATA_PATH / "manual" / db_name
+        match mode:
+            case "rw":
+                self._conn = sqlite3.connect(path)
+                # WAL 允許讀寫並行，NORMAL 只在檢查點時 fsync
+                self._conn.execute("PRAGMA journal_mode = WAL")
+                self._conn.execute("PRAGMA synchronous = NORMAL")
+            case "ro":
+                self._conn = sqlite3.connect(f"{path.as_uri()}?mode=ro", uri=True)
+            case _:
+                raise ValueError(f"Unknown mode: {mode}")
+        for pragma in PRAGMAS:
+            self._conn.execute(f"PRAGMA {pragma}")
         self._conn.row_factory = sqlite3.Row
         self.cursor = self._conn.cursor()
+        self.snapshots = Snapshots(self._conn, path)
+        # 內存中的索引：表或視圖名 -> (依賴的表, 值)；寫入這些表後失效
+        self._caches: dict[str, tuple[set[str], Any]] = {}
+        # 經 transaction 聲明的寫入：寫入的表，及其改動的行數
+        self._written: set[str] = set()
+        self._recorded = 0
+        self._total_changes = self._conn.total_changes
+        self._data_version = None
         self.lang_en = lang_en
         self.lang_cn = SYLLABLE_MAP[lang_en].NAME
         self.Syllable = SYLLABLE_MAP[lang_en]
         self.get_reflex = REFLEX_GETTER_MAP.get(lang_en, None)
 
+    def __enter__(self) -> "Updater":
+        return self
+
+    def __exit__(self, exc_type, *_) -> None:
+        if exc_type is not None and self._conn.in_transaction:
+            self._conn.rollback()
+            self._caches.clear()
+        self.close()
+
     def __del__(self):
+        self.close()
+
+    def close(self) -> None:
+        """提交未提交的修改並關閉連接"""
+        if getattr(self, "_conn", None) is None:
+            return
         self._conn.commit()
         self._conn.close()
+        self._conn = None
+
+    @contextmanager
+    def transaction(self, *tables: str) -> Iterator[sqlite3.Cursor]:
+        """在同一事務中執行，出錯則全部回滾；嵌套時併入外層事務
+
+        tables: 其中寫入的表，寫入後依賴它們的索引失效；未聲明的寫入使全部索引失效
+        """
+
+        total_changes, recorded = self._conn.total_changes, self._recorded
+        try:
+            if self._conn.in_transaction:
+                yield self.cursor
+                return
+            self._conn.execute("BEGIN")
+            try:
+                yield self.cursor
+            except BaseException:
+                self._conn.rollback()
+                self._caches.clear()  # 事務中生成的索引可能含有回滾的數據
+                raise
+            self._conn.commit()
+        finally:
+            if tables:
+                # 改動數已包括嵌套的塊中的，從進入時的記錄算起，免得重複計算
+                changes = self._conn.total_changes - total_changes
+                self._recorded = recorded + changes
+                self._written.update(tables)
 
     @property
     def data(self) -> list[dict[str, Any]]:
         """查詢結果"""
         return [dict(row) for row in self.cursor.fetchall()]
 
-    @cached_property
-    def mc_entry_map(self) -> dict[int, dict[str, Any]]:
-        """廣韻小韻數據"""
-        self.cursor.execute("SELECT * FROM 小韻全")
-        syllables = {}
-        for row in self.data:
-            syllables[row["小韻號"]] = row
-        return syllables
+    def columns(self, source: str) -> list[str]:
+        """表或視圖的列名"""
+        return [row[1] for row in self._conn.execute(f'PRAGMA table_info("{source}")')]
 
-    @cached_property
-    def mc_dictionary(self) -> dict[str, list[dict[str, Any]]]:
-        """廣韻字典"""
-        self.cursor.execute("SELECT * FROM 字頭全")
+    def iter_rows(
+        self,
+        source: str,
+        columns: Sequence[str] | None = None,
+        where: str = "",
+        params: Sequence[Any] = (),
+        order_by: str = "",
+        record: str = "dict",
+        batch_size: int = 1024,
+    ) -> Iterator[Any]:
+        """逐批讀取表或視圖的行，不把整個結果集讀入內存
+
+        columns: 只讀取這些列，默認全部
+        where: WHERE 子句，參數見 params
+        order_by: ORDER BY 子句
+        record: "dict" 字典；"tuple" 元組；"record" 按列名訪問的輕量記錄
+        """
+
+        projection = ", ".join(columns) if columns else "*"
+        query = f"SELECT {projection} FROM {source}"
+        if where:
+            query += f" WHERE {where}"
+        if order_by:
+            query += f" ORDER BY {order_by}"
+        # 另開游標，不影響 self.cursor 上的查詢
+        cursor = self._conn.cursor()
+        cursor.row_factory = None
+        cursor.arraysize = batch_size
+        cursor.execute(query, params)
+        names = tuple(column for column, *_ in cursor.description)
+
+        match record:
+            case "dict":
+                make = lambda row: dict(zip(names, row))
+            case "tuple":
+                make = None
+            case "record":
+                make = record_type(names)._make
+            case _:
+                raise ValueError(f"Unknown record: {record}")
+
+        while batch := cursor.fetchmany():
+            yield from batch if make is None else map(make, batch)
+
+    def table_checksum(self, table: str) -> str:
+        """表內容的哈希值，內容不變則不變"""
+        return table_checksum(self._conn, table)
+
+    def invalidate(self) -> list[str]:
+        """丟棄依賴於已寫入的表的索引，返回其名稱
+
+        本連接經 transaction 聲明的寫入按表處理；有未聲明的寫入，或其他連接提交了
+        修改，則丟棄全部索引
+        """
+
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        changes = self._conn.total_changes - self._total_changes
+        if data_version != self._data_version or changes != self._recorded:
+            self._data_version = data_version
+            stale = list(self._caches)
+        else:
+            stale = [
+                name
+                for name, (tables, _) in self._caches.items()
+                if tables & self._written
+            ]
+        self._written.clear()
+        self._recorded = 0
+        self._total_changes = self._conn.total_changes
+        for name in stale:
+            del self._caches[name]
+        return stale
+
+    def _cached(self, source: str, build: Callable[[], Any]) -> Any:
+        """由表或視圖 source 生成的索引"""
+
+        self.invalidate()
+        if source not in self._caches:
+            tables = source_tables(self._conn, source)
+            self._caches[source] = (
+                tables,
+                self.snapshots.load(source, [source], build),
+            )
+        return self._caches[source][1]
+
+    def _build_dictionary(self, source: str) -> dict[str, list[dict[str, Any]]]:
         dictionary = defaultdict(list)
-        for row in self.data:
+        for row in self.iter_rows(source):
             dictionary[row["字頭"]].append(row)
         return dictionary
 
+    @property
+    def mc_entry_map(self) -> dict[int, dict[str, Any]]:
+        """廣韻小韻數據，數據庫不變時從快照載入"""
+        return self._cached(
+            "小韻全",
+            lambda: {row["小韻號"]: row for row in self.iter_rows("小韻全")},
+        )
+
+    @property
+    def mc_dictionary(self) -> dict[str, list[dict[str, Any]]]:
+        """廣韻字典，數據庫不變時從快照載入"""
+        return self._cached("字頭全", lambda: self._build_dictionary("字頭全"))
+
+    def mc_entries(self, 字: str) -> list[dict[str, Any]]:
+        """某字的廣韻字條
+
+        按字頭走索引查詢，並緩存最近查過的字，不必載入整個 mc_dictionary；
+        批量處理時仍應使用 mc_dictionary
+        """
+
+        self.invalidate()
+        if "mc_entries" not in self._caches:
+            tables = source_tables(self._conn, "字頭全")
+            self._caches["mc_entries"] = (tables, OrderedDict())
+        recent = self._caches["mc_entries"][1]
+
+        if 字 in recent:
+            recent.move_to_end(字)
+        else:
+            recent[字] = list(
+                self.iter_rows(
+                    "字頭全", where="字頭 = ?", params=(字,), order_by="小韻號"
+                )
+            )
+            if len(recent) > MC_ENTRIES_SIZE:
+                recent.popitem(last=False)
+        return recent[字]
+
     def get_dictionary(self, language: str = "") -> dict[str, list[dict[str, Any]]]:
         """現代方言字典
 
@@ -65,11 +301,7 @@ class Updater:
         if language in SYLLABLE_MAP:
             lang_cn = SYLLABLE_MAP[language].NAME
 
-        self.cursor.execute(f"SELECT * FROM {lang_cn}")
-        dictionary = defaultdict(list)
-        for row in self.data:
-            dictionary[row["字頭"]].append(row)
-        return dictionary
+        return self._cached(lang_cn, lambda: self._build_dictionary(lang_cn))
 
     @staticmethod
     def show_syllable(row: dict[str, str], include_tone: bool = True) -> str:
@@ -96,40 +328,90 @@ class Updater:
 
     """utility scripts"""
 
-    def update_reflex(self) -> None:
-        """推導所有小韻的現代音"""
+    def update_reflex(self, incremental: bool = True) -> None:
+        """推導所有小韻的現代音
+
+        incremental: 只寫入推導結果有變化的小韻；否則重寫所有小韻
+        """
 
         if self.get_reflex is None:
             raise Exception("暫不支持從中古音推導該方言。")
 
+        column = f"推導{self.lang_cn}"
+        timings = {}
+
+        start = time.perf_counter()
         self.cursor.execute("SELECT * FROM 小韻全")
-        updated = []
-        for row in self.data:
-            expected_reflex = self.Syllable.parse_ipa(
-                Updater.show_syllable(self.get_reflex(row))
-            ).pinyin()
-            self.cursor.execute(
-                f"UPDATE 小韻 SET 推導{self.lang_cn} = ? WHERE 小韻號 = ?",
-                (expected_reflex, row["小韻號"]),
-            )
-            if expected_reflex != row[f"推導{self.lang_cn}"]:
+        rows = self.data
+        timings["查詢"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        syllables, _ = self.Syllable.parse_many(
+            (Updater.show_syllable(self.get_reflex(row)) for row in rows),
+            format="ipa",
+        )
+        timings["推導"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        changes, updated = [], []
+        for row, syllable in zip(rows, syllables):
+            expected_reflex = syllable.pinyin()
+            if expected_reflex != row[column]:
                 updated.append(
-                    f"{row['小韻號']} {row['字']}: {row[f'推導{self.lang_cn}']} -> {expected_reflex}"
+                    f"{row['小韻號']} {row['字']}: {row[column]} -> {expected_reflex}"
                 )
+            elif incremental:
+                continue
+            changes.append((expected_reflex, row["小韻號"]))
+        timings["比較"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        self.invalidate()
+        with self.transaction("小韻"):
+            self.cursor.executemany(
+                f"UPDATE 小韻 SET {column} = ? WHERE 小韻號 = ?", changes
+            )
+        self._patch_reflex(column, changes)
+        timings["寫入"] = time.perf_counter() - start
+
         print(f"推導{self.lang_cn}完成！共更新 {len(updated)} 個小韻。")
         for item in updated:
             print("  " + item)
-        self.__dict__.pop("dictionary", None)  # dictionary needs update
+        print(
+            "耗時："
+            + "，".join(
+                f"{phase} {seconds * 1000:.1f} ms" for phase, seconds in timings.items()
+            )
+        )
+
+    def _patch_reflex(self, column: str, changes: list[tuple[str, int]]) -> None:
+        """把寫入小韻表的推導音同步到已載入的索引，免得整個重建"""
+
+        reflexes = {小韻號: reflex for reflex, 小韻號 in changes}
+        for name, (tables, index) in list(self._caches.items()):
+            match name:
+                case "小韻全":
+                    for 小韻號, reflex in reflexes.items():
+                        index[小韻號][column] = reflex
+                case "字頭全" | "mc_entries":
+                    for entries in index.values():
+                        for entry in entries:
+                            if entry["小韻號"] in reflexes:
+                                entry[column] = reflexes[entry["小韻號"]]
+                case _ if "小韻" in tables:
+                    del self._caches[name]
+        self._written.discard("小韻")
 
     def compare_inventories(self) -> None:
         """比較推導音節集與記錄音節集（不計聲調）"""
 
-        self.cursor.execute(
-            f"SELECT * FROM 小韻全 WHERE 推導{self.lang_cn} IS NOT NULL"
-        )
         推導音節 = set()
-        for row in self.data:
-            推導音 = row[f"推導{self.lang_cn}"]
+        for (推導音,) in self.iter_rows(
+            "小韻全",
+            [f"推導{self.lang_cn}"],
+            where=f"推導{self.lang_cn} IS NOT NULL",
+            record="tuple",
+        ):
             推導音 = 推導音[:-1] if 推導音[-1].isdigit() else 推導音  # 除去聲調
             推導音節.add(推導音)
 
@@ -139,10 +421,9 @@ class Updater:
                 for [_, pron] in strata:
                     推導音節.add(pron[:-1])
 
-        self.cursor.execute(f"SELECT * FROM {self.lang_cn}")
         收錄音節 = set()
-        for row in self.data:
-            收錄音節.add(row["讀音"][:-1])
+        for (讀音,) in self.iter_rows(self.lang_cn, ["讀音"], record="tuple"):
+            收錄音節.add(讀音[:-1])
 
         def show_set(s: set[str]) -> str:
             return ", ".join(sorted(s))
@@ -159,48 +440,119 @@ class Updater:
 
     # recheck below
 
+    def _mc_tones(self, texts: Iterable[str | None]) -> dict[str, str]:
+        """讀音 -> 中古調類，每種讀音只解析一次；無法解析的不收"""
+
+        if self.lang_cn in ["日本語", "朝鮮語"]:
+            return {}
+        texts = list({text for text in texts if text is not None})
+        syllables, _ = self.Syllable.parse_many(texts, errors="skip")
+        return {
+            text: syllable.MC_tone
+            for text, syllable in zip(texts, syllables)
+            if syllable is not None
+        }
+
+    def _rank_mc(
+        self, 收錄音: str, entries: list[dict[str, Any]], tones: dict[str, str]
+    ) -> list[MCCandidate]:
+        """按與收錄音的吻合程度給廣韻字條排序"""
+
+        def match(entry: dict[str, Any]) -> str:
+            推導音 = entry[f"推導{self.lang_cn}"]
+            if 推導音 == 收錄音:
+                return "推導音"
+            if 推導音 in tones and 收錄音 in tones and tones[推導音] == tones[收錄音]:
+                return "調類"
+            return ""
+
+        matches = [match(entry) for entry in entries]
+        total = sum(MATCH_WEIGHTS[match] for match in matches) + MATCH_WEIGHTS[""]
+        candidates = [
+            MCCandidate(entry, match, MATCH_WEIGHTS[match] / total)
+            for entry, match in zip(entries, matches)
+        ]
+        return sorted(candidates, key=lambda candidate: -candidate.confidence)
+
     def _predict_mc(self, row: dict[str, Any]) -> list[dict[str, Any]]:
         """推導字條的廣韻字頭號"""
 
-        def is_match(推導音: str, 收錄音: str) -> bool:
-            return (
-                self.Syllable.parse_pinyin(推導音).MC_tone
-                == self.Syllable.parse_pinyin(收錄音).MC_tone
-            )
-
-        字 = row["字頭"]
-        收錄音 = row["讀音"]
-
-        entries = [
-            entry
-            for entry in self.mc_dictionary[字]
-            if entry["小韻號"] in self.mc_entry_map
-        ]
-        if len(entries) == 1:
+        entries = self.mc_entries(row["字頭"])  # 字頭全只含小韻表中有的小韻號
+        tones = self._mc_tones(
+            [row["讀音"], *(entry[f"推導{self.lang_cn}"] for entry in entries)]
+        )
+        candidates = self._rank_mc(row["讀音"], entries, tones)
+        if len(candidates) == 0 or candidates[0].match == "":
             return entries
-
-        exact_matches = [
-            entry for entry in entries if entry[f"推導{self.lang_cn}"] == 收錄音
+        return [
+            candidate.entry
+            for candidate in candidates
+            if candidate.match == candidates[0].match
         ]
-        if len(exact_matches) > 0:
-            return exact_matches
 
-        if self.lang_cn not in ["日本語", "朝鮮語"]:
-            matches = [
+    def resolve_mc_indexes(self, apply: bool = True) -> list[MCResolution]:
+        """給所有缺小韻號的字條排列候選的廣韻字條，並寫入無歧義的小韻號
+
+        apply: 在同一事務中寫入；否則只返回結果
+        """
+
+        column = f"推導{self.lang_cn}"
+        if column not in self.columns("字頭全"):
+            raise ValueError(f"字頭全 has no {column}")
+        rows = list(
+            self.iter_rows(
+                self.lang_cn,
+                ["rowid", "字頭", "讀音", "訓作"],
+                where="小韻號 IS NULL",
+            )
+        )
+        # 批量處理，直接用整個廣韻字典
+        dictionary, entry_map = self.mc_dictionary, self.mc_entry_map
+        candidates = {
+            row["rowid"]: [
                 entry
-                for entry in entries
-                if is_match(entry[f"推導{self.lang_cn}"], 收錄音)
+                for entry in dictionary.get(row["字頭"], [])
+                if entry["小韻號"] in entry_map
+            ]
+            for row in rows
+        }
+        tones = self._mc_tones(
+            [
+                *(row["讀音"] for row in rows),
+                *(
+                    entry[column]
+                    for entries in candidates.values()
+                    for entry in entries
+                ),
             ]
-            if len(matches) > 0:
-                return matches
+        )
+        resolutions = [
+            MCResolution(
+                row, self._rank_mc(row["讀音"], candidates[row["rowid"]], tones)
+            )
+            for row in rows
+        ]
 
-        return entries
+        if apply:
+            with self.transaction(self.lang_cn):
+                self.cursor.executemany(
+                    f"UPDATE {self.lang_cn} SET 小韻號 = ? "
+                    "WHERE rowid = ? AND 小韻號 IS NULL",
+                    [
+                        (resolution.best.entry["小韻號"], resolution.row["rowid"])
+                        for resolution in resolutions
+                        if resolution.unambiguous
+                    ],
+                )
+        return resolutions
 
     """以下專爲撫州話"""
 
     def add_mc_index(self, 字: str) -> None:
         """手動選擇撫州話字條的廣韻小韻號"""
 
+        import questionary  # 僅交互時需要，免得每個腳本都載入 prompt_toolkit
+
         self.cursor.execute("SELECT rowid, * FROM 撫州話 WHERE 字頭 = ?", (字,))
         data = self.data
         if len(data) == 0:
@@ -232,10 +584,11 @@ class Updater:
                 raise KeyboardInterrupt
 
             if "小韻號" in choice:
-                self.cursor.execute(
-                    "UPDATE 撫州話 SET 小韻號 = ? WHERE rowid = ?",
-                    (choice["小韻號"], row["rowid"]),
-                )
+                with self.transaction("撫州話"):
+                    self.cursor.execute(
+                        "UPDATE 撫州話 SET 小韻號 = ? WHERE rowid = ?",
+                        (choice["小韻號"], row["rowid"]),
+                    )
                 updated = True
             else:
                 unsure = True
@@ -245,6 +598,9 @@ class Updater:
     def add_entry(self, 字: str) -> None:
         """手動錄入撫州話字條"""
 
+        import questionary
+
+        FGSyllable = SYLLABLE_MAP["FG"]
         self.cursor.execute("SELECT * FROM 撫州話 WHERE 字頭 = ?", (字,))
         data = self.data
         if len(data) != 0:
@@ -255,7 +611,7 @@ class Updater:
         MC_index = None
         FG_syllable = None
 
-        entries = self.mc_dictionary[字]
+        entries = self.mc_entries(字)
         if len(entries) > 0:
             choice = questionary.select(
                 "請選擇廣韻字條：",
@@ -341,15 +697,16 @@ class Updater:
         if questionary.confirm("是否要附加信息？", default=False).ask():
             層, 訓作, 釋義 = map(get_optional_input, ["層", "訓作", "釋義"])
 
-        self.cursor.execute(
-            "INSERT INTO 撫州話 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-            (
-                字,
-                FG_syllable.pinyin(tone_diacritic=False),
-                *FG_syllable.tuple,
-                MC_index,
-                層,
-                訓作,
-                釋義,
-            ),
-        )
+        with self.transaction("撫州話"):
+            self.cursor.execute(
+                "INSERT INTO 撫州話 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    字,
+                    FG_syllable.pinyin(tone_diacritic=False),
+                    *FG_syllable.tuple,
+                    MC_index,
+                    層,
+                    訓作,
+                    釋義,
+                ),
+            )
@@ -1,25 +1,29 @@
+from .registry import LazyRegistry
 from .syllable import Syllable
-from .fg import FGSyllable
-from .pm import PMSyllable
-from .gc import GCSyllable
-from .sw import SWSyllable
-from .mh import MHSyllable
-from .jp import JPSyllable
-from .kr import KRSyllable
-from .vn import VNSyllable
 
 
 # 贛官粵吳客日朝越
-SYLLABLE_MAP: dict[str, type[Syllable]] = {
-    "FG": FGSyllable,
-    "PM": PMSyllable,
-    "GC": GCSyllable,
-    "SW": SWSyllable,
-    "MH": MHSyllable,
-    "JP": JPSyllable,
-    "KR": KRSyllable,
-    "VN": VNSyllable,
-}
+SYLLABLE_MAP: LazyRegistry = LazyRegistry(
+    {
+        "FG": ".fg:FGSyllable",
+        "PM": ".pm:PMSyllable",
+        "GC": ".gc:GCSyllable",
+        "SW": ".sw:SWSyllable",
+        "MH": ".mh:MHSyllable",
+        "JP": ".jp:JPSyllable",
+        "KR": ".kr:KRSyllable",
+        "VN": ".vn:VNSyllable",
+    },
+    __name__,
+)
+
+
+def __getattr__(name: str) -> type[Syllable]:
+    # language modules are imported on first use
+    try:
+        return SYLLABLE_MAP.find(name)
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 __all__ = [
@@ -9,7 +9,7 @@ Supports parsing from: ipa_raw, pinyin
 
 from unicodedata import normalize
 
-from .syllable import TonedSyllable
+from .syllable import PrefixTable, TonedSyllable, compile_finals
 
 
 class FGSyllable(TonedSyllable):
@@ -85,6 +85,59 @@ class FGSyllable(TonedSyllable):
         if tone in "1235"
     }
 
+    @staticmethod
+    def _parse_ipa_final(final: str, map_=IPA_TO_PINYIN_MAP) -> tuple[str, str, str]:
+        match len(final):
+            case 3:
+                return tuple(final)
+            case 2:
+                if final[1] in map_["coda"] and final not in ["ju", "wi", "ɥi"]:
+                    return "", *tuple(final)
+                else:
+                    return *tuple(final), ""
+            case 1:
+                return "", *tuple(final), ""
+        return "", final, ""
+
+    @staticmethod
+    def _parse_pinyin_final(final: str, map_=PINYIN_TO_IPA_MAP) -> tuple[str, str, str]:
+        """
+        Splits a Pinyin final into IPA medial, nucleus and coda.
+        """
+
+        match len(final) if final[-2:] != "ng" else len(final) - 1:
+            case 3:
+                parts = final[0], final[1], final[2:]
+            case 2:
+                if final[1:] in map_["coda"] and final not in ["iu", "ui"]:
+                    parts = "", final[0], final[1:]
+                else:
+                    parts = final[0], final[1:], ""
+            case _:
+                parts = "", final, ""
+        return tuple(
+            map_[part].get(val, val)
+            for part, val in zip(["medial", "nucleus", "coda"], parts)
+        )
+
+    _IPA_INITIAL_TABLE = PrefixTable(
+        {initial: initial for initial in IPA_TO_PINYIN_MAP["initial"]}
+    )
+    _IPA_FINAL_MAP = compile_finals(
+        _parse_ipa_final,
+        IPA_TO_PINYIN_MAP["medial"],
+        IPA_TO_PINYIN_MAP["nucleus"],
+        IPA_TO_PINYIN_MAP["coda"],
+    )
+
+    _PINYIN_INITIAL_TABLE = PrefixTable(PINYIN_TO_IPA_MAP["initial"])
+    _PINYIN_FINAL_MAP = compile_finals(
+        _parse_pinyin_final,
+        PINYIN_TO_IPA_MAP["medial"],
+        PINYIN_TO_IPA_MAP["nucleus"],
+        PINYIN_TO_IPA_MAP["coda"],
+    )
+
     @property
     def is_syllabic_nasal(self) -> bool:
         return super().is_syllabic_nasal and self.initial in list("mŋ")
@@ -176,29 +229,11 @@ class FGSyllable(TonedSyllable):
             "tɕʰjaŋ3" -> FGSyllable("tɕʰ", "j", "a", "ŋ", "3")
         """
 
-        initial_length = 3
-        while initial_length > 0:
-            if text[:initial_length] in FGSyllable.IPA_TO_PINYIN_MAP["initial"]:
-                break
-            initial_length -= 1
-        initial = text[:initial_length]
-
-        def parse_final(final: str) -> tuple[str, str, str]:
-            match len(final):
-                case 3:
-                    return tuple(final)
-                case 2:
-                    if final[1] in FGSyllable.IPA_TO_PINYIN_MAP[
-                        "coda"
-                    ] and final not in ["ju", "wi", "ɥi"]:
-                        return "", *tuple(final)
-                    else:
-                        return *tuple(final), ""
-                case 1:
-                    return "", *tuple(final), ""
-            return "", final, ""
-
-        medial, nucleus, coda = parse_final(text[initial_length:-1])
+        initial_length, initial = FGSyllable._IPA_INITIAL_TABLE.match(text)
+        final = text[initial_length:-1]
+        medial, nucleus, coda = FGSyllable._IPA_FINAL_MAP.get(
+            final
+        ) or FGSyllable._parse_ipa_final(final)
 
         tone = text[-1]
 
@@ -231,35 +266,11 @@ class FGSyllable(TonedSyllable):
             tone = text[-1]
             text = text[:-1]
 
-        initial_length = 2
-        while initial_length > 0:
-            if text[:initial_length] in FGSyllable.PINYIN_TO_IPA_MAP["initial"]:
-                break
-            initial_length -= 1
-        initial = text[:initial_length]
+        initial_length, initial = FGSyllable._PINYIN_INITIAL_TABLE.match(text)
         final = text[initial_length:]
-
-        def parse_final(final: str) -> tuple[str, str, str]:
-            match len(final) if final[-2:] != "ng" else len(final) - 1:
-                case 3:
-                    return final[0], final[1], final[2:]
-                case 2:
-                    if final[1:] in FGSyllable.PINYIN_TO_IPA_MAP[
-                        "coda"
-                    ] and final not in ["iu", "ui"]:
-                        return "", final[0], final[1:]
-                    else:
-                        return final[0], final[1:], ""
-                case 1:
-                    return "", final, ""
-            return "", final, ""
-
-        medial, nucleus, coda = parse_final(final)
-
-        initial, medial, nucleus, coda = (
-            FGSyllable.PINYIN_TO_IPA_MAP[part].get(val, val)
-            for part, val in zip(cls.PARTS, [initial, medial, nucleus, coda])
-        )
+        medial, nucleus, coda = FGSyllable._PINYIN_FINAL_MAP.get(
+            final
+        ) or FGSyllable._parse_pinyin_final(final)
 
         if nucleus == "ɿ" and not (medial == "" and initial in ["ts", "tsʰ", "s", "l"]):
             nucleus = "i"
@@ -9,7 +9,7 @@ Supports parsing from: pinyin
 
 from itertools import product
 
-from .syllable import TonedSyllable
+from .syllable import PrefixTable, TonedSyllable, compile_finals
 
 
 class GCSyllable(TonedSyllable):
@@ -75,6 +75,31 @@ class GCSyllable(TonedSyllable):
         )
     }
 
+    @staticmethod
+    def _parse_final(
+        final: str, map_=PINYIN_TO_IPA_MAP, final_map=_FINAL_MAP
+    ) -> tuple[str, str, str]:
+        """
+        Splits a Jyutping final into IPA medial, nucleus and coda.
+        """
+
+        medial = ""
+        if final[0] in list("jw"):
+            medial = map_["medial"][final[0]]
+            final = final[1:]
+
+        nucleus, coda = final_map.get(final, (final, ""))
+
+        if (medial == "j" and nucleus == "i") or (medial == "w" and nucleus == "u"):
+            medial = ""
+
+        return medial, nucleus, coda
+
+    _INITIAL_TABLE = PrefixTable(PINYIN_TO_IPA_MAP["initial"])
+    _MEDIAL_FINAL_MAP = compile_finals(
+        _parse_final, PINYIN_TO_IPA_MAP["medial"], _FINAL_MAP
+    )
+
     TONE_NOTATION_MAP = {
         "0": {"name": "輕聲"},
         "1": {"name": "陰平"},
@@ -211,23 +236,11 @@ class GCSyllable(TonedSyllable):
         if text == "ng":
             return cls("ŋ", "", "", "", tone)
 
-        initial_length = 2
-        while initial_length > 0:
-            if text[:initial_length] in GCSyllable.PINYIN_TO_IPA_MAP["initial"]:
-                break
-            initial_length -= 1
-        initial = GCSyllable.PINYIN_TO_IPA_MAP["initial"][text[:initial_length]]
+        initial_length, initial = GCSyllable._INITIAL_TABLE.match(text)
         final = text[initial_length:]
-
-        medial = ""
-        if final[0] in list("jw"):
-            medial = GCSyllable.PINYIN_TO_IPA_MAP["medial"][final[0]]
-            final = final[1:]
-
-        nucleus, coda = GCSyllable._FINAL_MAP.get(final, (final, ""))
-
-        if (medial == "j" and nucleus == "i") or (medial == "w" and nucleus == "u"):
-            medial = ""
+        medial, nucleus, coda = GCSyllable._MEDIAL_FINAL_MAP.get(
+            final
+        ) or GCSyllable._parse_final(final)
 
         if coda in list("ptk"):
             tone = GCSyllable._CHECKED_TONE_MAP.get(tone, tone)
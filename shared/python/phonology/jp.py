@@ -11,6 +11,7 @@ Supports parsing from: all
 """
 
 from dataclasses import dataclass
+from functools import lru_cache
 
 from .syllable import Syllable
 
@@ -193,14 +194,30 @@ class Kana:
         return getattr(self, format)
 
     @classmethod
-    def parse(cls, text: str, format: str = "") -> "Kana":
+    @lru_cache(maxsize=None)
+    def _instances(cls) -> list["Kana"]:
+        return [cls(i) for i in range(len(cls.CONVERSION_TABLE))]
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _index(cls, format: str) -> dict[str, "Kana"]:
+        """
+        Reverse index of one format (or all formats if ""). The first row
+        in CONVERSION_TABLE wins, as in a linear scan.
+        """
         formats = cls.FORMATS if format == "" else [format]
-        for i in range(len(cls.CONVERSION_TABLE)):
-            kana = Kana(i)
+        index = {}
+        for kana in cls._instances():
             for format_ in formats:
-                if getattr(kana, format_) == text:
-                    return kana
-        raise ValueError(f"Kana not found: {text}.")
+                index.setdefault(getattr(kana, format_), kana)
+        return index
+
+    @classmethod
+    def parse(cls, text: str, format: str = "") -> "Kana":
+        kana = cls._index(format).get(text)
+        if kana is None:
+            raise ValueError(f"Kana not found: {text}.")
+        return kana
 
     @staticmethod
     def small_to_normal(text: str) -> str:
@@ -307,20 +324,38 @@ class JPSyllable(Syllable):
 
         formats = Kana.FORMATS if format == "" else [format]
         for format_ in formats:
-            for coda in cls.CODAS:
-                try:
-                    coda_form = getattr(Kana.parse(coda, "ipa_raw"), format_)
-                    if text.endswith(coda_form):
-                        return cls(
-                            *Kana.parse(
-                                text[: len(text) - len(coda_form)], format_
-                            ).tuple,
-                            coda,
-                        )
-                except Exception:
-                    continue
+            heads = JPSyllable._head_index(format_)
+            for coda, coda_form in JPSyllable._coda_forms(format_):
+                if text.endswith(coda_form):
+                    head = heads.get(text[: len(text) - len(coda_form)])
+                    if head is None:
+                        continue
+                    try:
+                        return cls(*head, coda)
+                    except ValueError:
+                        continue  # illegal combination, try the next split
         raise ValueError(f"Illegal Japanese syllable: {text}.")
 
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _head_index(format: str) -> dict[str, tuple[str, str, str]]:
+        """
+        Kana that can start a syllable (not ん, っ), by spelling.
+        """
+        return {
+            text: kana.tuple
+            for text, kana in Kana._index(format).items()
+            if len(kana.tuple) == 3
+        }
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _coda_forms(format: str) -> list[tuple[str, str]]:
+        return [
+            (coda, getattr(Kana.parse(coda, "ipa_raw"), format))
+            for coda in JPSyllable.CODAS
+        ]
+
     @classmethod
     def old_to_new(cls, syllable: "JPSyllable") -> "JPSyllable":
         """
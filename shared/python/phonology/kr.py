@@ -94,6 +94,10 @@ class Hangul:
         "ㅎ",
     ]
 
+    L_INDEX = {jamo: i for i, jamo in enumerate(L_COMPAT)}
+    V_INDEX = {jamo: i for i, jamo in enumerate(V_COMPAT)}
+    T_INDEX = {jamo: i for i, jamo in enumerate(T_COMPAT)}
+
     SBase = 0xAC00
     LCount = 19
     VCount = 21
@@ -124,12 +128,12 @@ class Hangul:
         i = 0
         while i < len(jamo):
             ch = jamo[i]
-            if ch in cls.L_COMPAT and i + 1 < len(jamo) and jamo[i + 1] in cls.V_COMPAT:
-                L = cls.L_COMPAT.index(jamo[i])
-                V = cls.V_COMPAT.index(jamo[i + 1])
+            if ch in cls.L_INDEX and i + 1 < len(jamo) and jamo[i + 1] in cls.V_INDEX:
+                L = cls.L_INDEX[jamo[i]]
+                V = cls.V_INDEX[jamo[i + 1]]
                 T = 0
-                if i + 2 < len(jamo) and jamo[i + 2] in cls.T_COMPAT:
-                    T_candidate = cls.T_COMPAT.index(jamo[i + 2])
+                if i + 2 < len(jamo) and jamo[i + 2] in cls.T_INDEX:
+                    T_candidate = cls.T_INDEX[jamo[i + 2]]
                     if T_candidate != 0:
                         T = T_candidate
                         i += 1
@@ -267,19 +271,21 @@ class KRSyllable(Syllable):
             ]
         )
 
-    def _ipa_to_RR(self, part: str) -> str:
-        return KRSyllable.IPA_TO_RR_MAP[part].get(
-            getattr(self, part), getattr(self, part)
+    @staticmethod
+    def _to_RR(initial: str, medial: str, nucleus: str, coda: str) -> str:
+        map_ = KRSyllable.IPA_TO_RR_MAP
+        vowel = map_["vowel"].get((medial, nucleus))
+        if vowel is None:
+            vowel = map_["medial"].get(medial, medial) + map_["nucleus"].get(
+                nucleus, nucleus
+            )
+        return (
+            map_["initial"].get(initial, initial) + vowel + map_["coda"].get(coda, coda)
         )
 
     @property
     def RR(self) -> str:
-        initial, (medial, nucleus), coda = (
-            self._ipa_to_RR(part) for part in self.PARTS
-        )
-        if self.vowel not in KRSyllable.IPA_TO_RR_MAP["vowel"]:
-            medial, nucleus = self._ipa_to_RR("medial"), self._ipa_to_RR("nucleus")
-        return "".join([initial, medial, nucleus, coda])
+        return KRSyllable._to_RR(*self.tuple)
 
     def pinyin(self, format: str = "hangul") -> str:
         return getattr(self, format)
@@ -296,8 +302,9 @@ class KRSyllable(Syllable):
     @classmethod
     @lru_cache(maxsize=None)
     def _RR_parser(cls) -> dict[str, tuple[str, ...]]:
+        # every combination is legal, so skip constructing KRSyllable
         return {
-            cls(initial, *vowel, coda).RR: (initial, *vowel, coda)
+            cls._to_RR(initial, *vowel, coda): (initial, *vowel, coda)
             for initial, vowel, coda in product(
                 *(KRSyllable.HANGUL_TO_IPA_MAP[part].values() for part in cls.PARTS)
             )
@@ -305,7 +312,7 @@ class KRSyllable(Syllable):
 
     @classmethod
     def parse_RR(cls, text: str) -> "KRSyllable":
-        return cls(cls._RR_parser()[text])
+        return cls(*cls._RR_parser()[text])
 
     @classmethod
     def parse_pinyin(cls, text, format: str = "hangul"):
@@ -7,7 +7,7 @@ Preferred: 臺灣式拼音（改動入聲尾）
 Supports parsing from: ipa_raw, pinyin
 """
 
-from .syllable import TonedSyllable
+from .syllable import PrefixTable, TonedSyllable, compile_finals
 
 
 class MHSyllable(TonedSyllable):
@@ -65,6 +65,61 @@ class MHSyllable(TonedSyllable):
         for part, dct in IPA_TO_PINYIN_MAP.items()
     }
 
+    @staticmethod
+    def _parse_ipa_final(final: str, map_=IPA_TO_PINYIN_MAP) -> tuple[str, str, str]:
+        match len(final):
+            case 3:
+                return tuple(final)
+            case 2:
+                if final[1] in map_["coda"] and final not in ["iu", "ui", "ju", "wi"]:
+                    return "", *tuple(final)
+                else:
+                    return *tuple(final), ""
+            case 1:
+                return "", *tuple(final), ""
+        return "", final, ""
+
+    @staticmethod
+    def _parse_pinyin_final(final: str, map_=PINYIN_TO_IPA_MAP) -> tuple[str, str, str]:
+        """
+        Splits a Pinyin final into IPA medial, nucleus and coda.
+        """
+
+        match len(final) if final[-2:] != "ng" else len(final) - 1:
+            case _ if final[:2] == "ii":
+                parts = "", "ii", final[2:]
+            case 3:
+                parts = final[0], final[1], final[2:]
+            case 2:
+                if final[1:] in map_["coda"] and final not in ["iu", "ui"]:
+                    parts = "", final[0], final[1:]
+                else:
+                    parts = final[0], final[1:], ""
+            case _:
+                parts = "", final, ""
+        return tuple(
+            map_[part].get(val, val)
+            for part, val in zip(["medial", "nucleus", "coda"], parts)
+        )
+
+    _IPA_INITIAL_TABLE = PrefixTable(
+        {initial: initial for initial in IPA_TO_PINYIN_MAP["initial"]}
+    )
+    _IPA_FINAL_MAP = compile_finals(
+        _parse_ipa_final,
+        IPA_TO_PINYIN_MAP["medial"],
+        IPA_TO_PINYIN_MAP["nucleus"],
+        IPA_TO_PINYIN_MAP["coda"],
+    )
+
+    _PINYIN_INITIAL_TABLE = PrefixTable(PINYIN_TO_IPA_MAP["initial"])
+    _PINYIN_FINAL_MAP = compile_finals(
+        _parse_pinyin_final,
+        PINYIN_TO_IPA_MAP["medial"],
+        PINYIN_TO_IPA_MAP["nucleus"],
+        PINYIN_TO_IPA_MAP["coda"],
+    )
+
     _PALATALIZATION = {
         "k": "c",
         "kʰ": "cʰ",
@@ -143,29 +198,11 @@ class MHSyllable(TonedSyllable):
         text = TonedSyllable.sup_to_normal(text)
         tone = text[-1]
 
-        initial_length = 3
-        while initial_length > 0:
-            if text[:initial_length] in MHSyllable.IPA_TO_PINYIN_MAP["initial"]:
-                break
-            initial_length -= 1
-        initial = text[:initial_length]
-
-        def parse_final(final: str) -> tuple[str, str, str]:
-            match len(final):
-                case 3:
-                    return tuple(final)
-                case 2:
-                    if final[1] in MHSyllable.IPA_TO_PINYIN_MAP[
-                        "coda"
-                    ] and final not in ["iu", "ui", "ju", "wi"]:
-                        return "", *tuple(final)
-                    else:
-                        return *tuple(final), ""
-                case 1:
-                    return "", *tuple(final), ""
-            return "", final, ""
-
-        medial, nucleus, coda = parse_final(text[initial_length:-1])
+        initial_length, initial = MHSyllable._IPA_INITIAL_TABLE.match(text)
+        final = text[initial_length:-1]
+        medial, nucleus, coda = MHSyllable._IPA_FINAL_MAP.get(
+            final
+        ) or MHSyllable._parse_ipa_final(final)
 
         if medial == "i":
             medial = "j"
@@ -195,36 +232,13 @@ class MHSyllable(TonedSyllable):
             tone = text[-1]
             text = text[:-1]
 
-        initial_length = 2
-        while initial_length > 0:
-            if text[:initial_length] in MHSyllable.PINYIN_TO_IPA_MAP["initial"]:
-                break
-            initial_length -= 1
-        initial = text[:initial_length]
+        initial_length, initial = MHSyllable._PINYIN_INITIAL_TABLE.match(text)
         final = text[initial_length:]
-
-        def parse_final(final: str) -> tuple[str, str, str]:
-            if final[:2] == "ii":
-                return "", "ii", final[2:]
-            match len(final) if final[-2:] != "ng" else len(final) - 1:
-                case 3:
-                    return final[0], final[1], final[2:]
-                case 2:
-                    if final[1:] in MHSyllable.PINYIN_TO_IPA_MAP[
-                        "coda"
-                    ] and final not in ["iu", "ui"]:
-                        return "", final[0], final[1:]
-                    else:
-                        return final[0], final[1:], ""
-                case 1:
-                    return "", final, ""
-            return "", final, ""
-
-        medial, nucleus, coda = parse_final(final) if final != "" else ("", "", "")
-
-        initial, medial, nucleus, coda = (
-            MHSyllable.PINYIN_TO_IPA_MAP[part].get(val, val)
-            for part, val in zip(cls.PARTS, [initial, medial, nucleus, coda])
+        medial, nucleus, coda = (
+            MHSyllable._PINYIN_FINAL_MAP.get(final)
+            or MHSyllable._parse_pinyin_final(final)
+            if final != ""
+            else ("", "", "")
         )
 
         if nucleus == "ə" and coda == "":
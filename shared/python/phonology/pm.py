@@ -9,7 +9,7 @@ Supports parsing from: pinyin
 
 from unicodedata import normalize
 
-from .syllable import TonedSyllable
+from .syllable import PrefixTable, TonedSyllable
 
 
 class PMSyllable(TonedSyllable):
@@ -102,6 +102,8 @@ class PMSyllable(TonedSyllable):
         if tone in "1234"
     }
 
+    _INITIAL_TABLE = PrefixTable(PINYIN_TO_IPA_MAP["initial"])
+
     @property
     def is_syllabic_nasal(self) -> bool:
         return super().is_syllabic_nasal and self.initial == "ŋ"
@@ -257,14 +259,7 @@ class PMSyllable(TonedSyllable):
         if text[0] in "jqx" and text[1] == "u":
             text = text[0] + "ü" + text[2:]
 
-        initial_length = 2
-        while initial_length > 0:
-            if text[:initial_length] in PMSyllable.PINYIN_TO_IPA_MAP["initial"]:
-                break
-            initial_length -= 1
-        initial = PMSyllable.PINYIN_TO_IPA_MAP["initial"].get(
-            text[:initial_length], text[:initial_length]
-        )
+        initial_length, initial = PMSyllable._INITIAL_TABLE.match(text)
         final = text[initial_length:]
         medial, nucleus, coda = PMSyllable.PINYIN_TO_IPA_MAP["final"].get(
             final, ("", final, "")
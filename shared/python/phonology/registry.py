@@ -0,0 +1,47 @@
+"""
+Registries whose values are imported on first access, so that a script
+only pays for the languages it uses.
+"""
+
+from collections.abc import Mapping
+from importlib import import_module
+from typing import Any, Iterator
+
+
+class LazyRegistry(Mapping):
+    """
+    Read-only mapping from keys to "module:attribute" paths. The module is
+    imported when its key is first looked up.
+    """
+
+    def __init__(self, paths: dict[str, str], package: str | None = None):
+        self._paths = paths
+        self._package = package
+        self._loaded: dict[str, Any] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._loaded:
+            module, attribute = self._paths[key].split(":")
+            self._loaded[key] = getattr(import_module(module, self._package), attribute)
+        return self._loaded[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._paths
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self._paths)})"
+
+    def find(self, attribute: str) -> Any:
+        """
+        Looks up a value by its attribute name, for module __getattr__.
+        """
+        for key, path in self._paths.items():
+            if path.split(":")[1] == attribute:
+                return self[key]
+        raise KeyError(attribute)
@@ -1,9 +1,92 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, fields
-from typing import Type, TypeVar
+from functools import lru_cache, wraps
+from itertools import product
+from operator import attrgetter
+from typing import Any, Callable, Iterable, Type, TypeVar
+from weakref import WeakValueDictionary
 
 
 T = TypeVar("T", bound="Syllable")
+V = TypeVar("V")
+
+
+PARSE_CACHE_SIZE = 8192
+
+# syllable class -> getter of the field values its instances are interned by
+_INTERN_KEYS: dict[type, attrgetter] = {}
+
+
+def _interned(parse: Callable[..., T]) -> Callable[..., T]:
+    """
+    Caches a parse_* classmethod and returns canonical instances, so that
+    equal syllables parsed from different texts are the same object.
+
+    The intern table only holds weak references: a syllable leaves it once
+    neither the parse caches nor any caller keep it alive, so its size is
+    bounded by the caches rather than by every syllable ever parsed.
+    """
+
+    @lru_cache(maxsize=PARSE_CACHE_SIZE)
+    @wraps(parse)
+    def wrapper(cls, *args, **kwargs):
+        syllable = parse(cls, *args, **kwargs)
+        key_of = _INTERN_KEYS.get(type(syllable))
+        if key_of is None:
+            names = [f.name for f in fields(syllable)]
+            key_of = _INTERN_KEYS[type(syllable)] = attrgetter(*names)
+        return cls._INTERNED.setdefault(key_of(syllable), syllable)
+
+    return wrapper
+
+
+class PrefixTable:
+    """
+    Longest-match lookup in a spelling table by probing slices of the text,
+    longest first. Only lengths that some key has are probed, so a lookup
+    takes at most a few dict probes.
+    """
+
+    def __init__(self, table: dict[str, Any], reverse: bool = False):
+        self.table = table
+        self.reverse = reverse
+        self.lengths = sorted({len(key) for key in table}, reverse=True)
+
+    def match(
+        self, text: str, start: int = 0, stop: int | None = None
+    ) -> tuple[int, Any]:
+        """
+        Finds the longest key in text[start:stop] anchored at start
+        (or at stop if reverse). Returns its length and value.
+
+        Raises KeyError if no key (not even "") matches.
+        """
+
+        stop = len(text) if stop is None else stop
+        table = self.table
+        for length in self.lengths:
+            if length > stop - start:
+                continue
+            key = (
+                text[stop - length : stop]
+                if self.reverse
+                else text[start : start + length]
+            )
+            if key in table:
+                return length, table[key]
+        raise KeyError(text[start:stop])
+
+
+def compile_finals(
+    parse_final: Callable[[str], V], *inventories: Iterable[str]
+) -> dict[str, V]:
+    """
+    Tabulates parse_final over every concatenation of part spellings, so
+    that parsing a well-formed final is a single dict lookup.
+    """
+    finals = {"".join(parts) for parts in product(*inventories)}
+    finals.discard("")
+    return {final: parse_final(final) for final in finals}
 
 
 @dataclass(frozen=True)
@@ -44,6 +127,34 @@ class Syllable(ABC):
         },
     }
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._INTERNED = WeakValueDictionary()
+        for name, attr in list(vars(cls).items()):
+            if name.startswith("parse_") and isinstance(attr, classmethod):
+                setattr(cls, name, classmethod(_interned(attr.__func__)))
+
+    @classmethod
+    def _parsers(cls) -> dict[str, Callable]:
+        return {
+            name: getattr(cls, name)
+            for name in dir(cls)
+            if name.startswith("parse_") and hasattr(getattr(cls, name), "cache_info")
+        }
+
+    @classmethod
+    def cache_info(cls) -> dict[str, tuple[int, int, int, int]]:
+        """
+        Hit/miss statistics of the parse caches, by method name.
+        """
+        return {name: parser.cache_info() for name, parser in cls._parsers().items()}
+
+    @classmethod
+    def cache_clear(cls) -> None:
+        for parser in cls._parsers().values():
+            parser.cache_clear()
+        cls._INTERNED.clear()
+
     @property
     def tuple(self) -> tuple[str, ...]:
         return tuple(getattr(self, f.name) for f in fields(self))
@@ -110,6 +221,46 @@ class Syllable(ABC):
         """
         pass
 
+    @classmethod
+    def parse_many(
+        cls: Type[T],
+        texts: Iterable[str],
+        format: str = "pinyin",
+        errors: str = "raise",
+        **kwargs,
+    ) -> "tuple[list[T | None], dict[str, str]]":
+        """
+        Parses texts with parse_{format}, each distinct text only once.
+
+        errors:
+            "raise": raise the first error
+            "collect": put None in place of failures and report them
+            "skip": put None in place of failures
+
+        Returns the syllables aligned with texts, and the error report
+        (text -> message) of distinct failed texts.
+        """
+
+        if errors not in ["raise", "collect", "skip"]:
+            raise ValueError(f"Unknown error handling: {errors}.")
+
+        parse = getattr(cls, f"parse_{format}")
+        parsed: dict[str, T | None] = {}
+        report: dict[str, str] = {}
+        results = []
+        for text in texts:
+            if text not in parsed:
+                try:
+                    parsed[text] = parse(text, **kwargs)
+                except Exception as e:
+                    if errors == "raise":
+                        raise
+                    parsed[text] = None
+                    if errors == "collect":
+                        report[text] = f"{type(e).__name__}: {e}"
+            results.append(parsed[text])
+        return results, report
+
 
 @dataclass(frozen=True)
 class TonedSyllable(Syllable):
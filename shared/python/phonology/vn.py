@@ -10,7 +10,7 @@ Supports parsing from: pinyin
 from unicodedata import normalize
 from copy import deepcopy
 
-from .syllable import TonedSyllable
+from .syllable import PrefixTable, TonedSyllable
 
 
 class VNSyllable(TonedSyllable):
@@ -112,6 +112,9 @@ class VNSyllable(TonedSyllable):
         info["diacritic"]: tone for tone, info in TONE_NOTATION_MAP.items()
     }
 
+    _INITIAL_TABLE = PrefixTable(PINYIN_TO_IPA_MAP["initial"])
+    _CODA_TABLE = PrefixTable(PINYIN_TO_IPA_MAP["coda"], reverse=True)
+
     IPA_STRICT_MAP = deepcopy(TonedSyllable.IPA_STRICT_MAP)
     IPA_STRICT_MAP["initial"].update(
         {
@@ -276,21 +279,12 @@ class VNSyllable(TonedSyllable):
 
         map_ = VNSyllable.PINYIN_TO_IPA_MAP
 
-        initial_length = 3
-        while initial_length > 0:
-            if text[:initial_length] in map_["initial"]:
-                break
-            initial_length -= 1
-        initial = map_["initial"][text[:initial_length]]
-        final = text[initial_length:]
-
-        coda_length = min(len(final) - 1, 2)
-        while coda_length > 0:
-            if final[len(final) - coda_length :] in map_["coda"]:
-                break
-            coda_length -= 1
-        coda = map_["coda"][final[len(final) - coda_length :]]
-        vowel = final[: len(final) - coda_length]
+        initial_length, initial = VNSyllable._INITIAL_TABLE.match(text)
+        # leave at least one letter for the vowel
+        coda_length, coda = VNSyllable._CODA_TABLE.match(
+            text, start=min(initial_length + 1, len(text))
+        )
+        vowel = text[initial_length : len(text) - coda_length]
 
         medial, nucleus = "", vowel
 
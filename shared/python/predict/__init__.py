@@ -1,6 +1,17 @@
-from .fg import 推導撫州話
-from .mh import 推導梅縣話
+from phonology.registry import LazyRegistry
+
+
+REFLEX_GETTER_MAP = LazyRegistry(
+    {"FG": ".fg:推導撫州話", "MH": ".mh:推導梅縣話"}, __name__
+)
+
+
+def __getattr__(name: str):
+    # derivation modules are imported on first use
+    try:
+        return REFLEX_GETTER_MAP.find(name)
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-REFLEX_GETTER_MAP = {"FG": 推導撫州話, "MH": 推導梅縣話}
 
 __all__ = ["REFLEX_GETTER_MAP", "推導撫州話", "推導梅縣話"]
@@ -6,9 +6,8 @@ This file defines a function to derive the expected Fuzhou Gan (FG) reflex
 of a Middle Chinese (MC) syllable.
 """
 
-import inspect
-
 from .constants import 非敷奉微_韻系
+from .pipeline import Pipeline
 
 
 def 推導聲母(
@@ -412,20 +411,7 @@ def 推導聲調(聲調: str, 清濁: str) -> str:
     raise Exception("聲調 not found!")
 
 
-def 推導撫州話(小韻: dict[str, str]) -> dict[str, str]:
-    def call_by_dict(func, params):
-        sig = inspect.signature(func)
-        filtered = {k: v for k, v in params.items() if k in sig.parameters}
-        return func(**filtered)
-
-    parts = ["韻腹", "韻尾", "介音", "聲母", "聲調"]  # 不可更改順序！
-    try:
-        for part in parts:
-            小韻[part] = call_by_dict(globals()[f"推導{part}"], 小韻)
-    except Exception as e:
-        print(小韻["小韻號"], {part: 小韻[part] for part in parts if part in 小韻})
-        raise Exception("Error in 推導撫州話:", e)
-
+def 修正撫州話(小韻: dict[str, str]) -> None:
     # 特殊情況：非敷奉微；曉匣合口 hw > f
     if 小韻["聲母"] == "f" and 小韻["介音"] == "w":
         小韻["介音"] = ""
@@ -437,9 +423,21 @@ def 推導撫州話(小韻: dict[str, str]) -> dict[str, str]:
     if 小韻["組"] == "莊" and 小韻["攝"] == "止" and 小韻["呼"] == "合":
         小韻["韻尾"] = "i"
 
-    # 爲修正 梗曾三合入 疫域
-    if 小韻["小韻號"] in [3715, 3662]:
-        小韻["介音"] = ""
-        小韻["韻腹"] = "y"
 
-    return {part: 小韻[part] for part in parts}
+推導撫州話 = Pipeline(
+    "推導撫州話",
+    {  # 不可更改順序！
+        "韻腹": 推導韻腹,
+        "韻尾": 推導韻尾,
+        "介音": 推導介音,
+        "聲母": 推導聲母,
+        "聲調": 推導聲調,
+    },
+    修正撫州話,
+    {
+        # 爲修正 梗曾三合入 疫域
+        3715: {"介音": "", "韻腹": "y"},
+        3662: {"介音": "", "韻腹": "y"},
+    },
+    fixup_fields=["組", "攝", "呼"],
+)
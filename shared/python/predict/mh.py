@@ -3,9 +3,8 @@
 最後更新：2025 年 8 月 21 日
 """
 
-import inspect
-
 from .constants import 非敷奉微_韻系
+from .pipeline import Pipeline
 
 
 def 推導聲母(
@@ -372,20 +371,7 @@ def 推導聲調(聲調: str, 清濁: str) -> str:
     raise Exception("聲調 not found!")
 
 
-def 推導梅縣話(小韻: dict[str, str]) -> dict[str, str]:
-    def call_by_dict(func, params):
-        sig = inspect.signature(func)
-        filtered = {k: v for k, v in params.items() if k in sig.parameters}
-        return func(**filtered)
-
-    parts = ["韻腹", "韻尾", "介音", "聲母", "聲調"]  # The order is important!
-    try:
-        for part in parts:
-            小韻[part] = call_by_dict(globals()[f"推導{part}"], 小韻)
-    except Exception as e:
-        print(小韻["小韻號"], {part: 小韻[part] for part in parts if part in 小韻})
-        raise Exception("Error in 推導梅縣話:", e)
-
+def 修正梅縣話(小韻: dict[str, str]) -> None:
     # 特殊情況：非敷奉微；曉蝦 hw > f
     if 小韻["聲母"] == "f" and 小韻["介音"] == "w":
         小韻["介音"] = ""
@@ -396,4 +382,15 @@ def 推導梅縣話(小韻: dict[str, str]) -> dict[str, str]:
         小韻["介音"] = ""
         小韻["聲母"] = "v"
 
-    return {part: 小韻[part] for part in parts}
+
+推導梅縣話 = Pipeline(
+    "推導梅縣話",
+    {  # The order is important!
+        "韻腹": 推導韻腹,
+        "韻尾": 推導韻尾,
+        "介音": 推導介音,
+        "聲母": 推導聲母,
+        "聲調": 推導聲調,
+    },
+    修正梅縣話,
+)
@@ -0,0 +1,135 @@
+"""
+Compiles the part functions of a derivation into a pipeline, so that their
+parameter lists are resolved once rather than on every 小韻.
+"""
+
+import inspect
+from collections import Counter
+from typing import Any, Callable, Iterable, NamedTuple
+
+
+class DerivationInfo(NamedTuple):
+    positions: int  # distinct phonological positions derived
+    hits: int
+    misses: int
+    # how often each part took each value ("part → value"), and each change the
+    # fixup made ("fixup：part old → new"); values, not the branches producing them
+    outcomes: Counter
+    overrides: Counter  # 小韻號 → calls that hit a special-case override
+
+
+class Pipeline:
+    """
+    Derives a modern reflex from a 小韻 row by calling each part function in
+    order. Every derived part is stored under its own name, so later parts can
+    read earlier ones. `fixup` then adjusts the parts in place for special
+    cases that no single part function can see, and `overrides` replaces parts
+    of individual 小韻 by number. The fixup cannot be inspected like the part
+    functions, so the row fields it reads are listed in `fixup_fields`.
+
+    Derivation only depends on the fields the part functions and the fixup
+    read (see `fields`), so the result for each position is computed once and
+    cached. The input row is never modified.
+
+    Calling a pipeline returns the derived parts, e.g.
+    {"韻腹": "a", "韻尾": "ŋ", "介音": "j", "聲母": "tɕʰ", "聲調": "1"}.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        parts: dict[str, Callable[..., str]],
+        fixup: Callable[[dict[str, str]], None] | None = None,
+        overrides: dict[int, dict[str, str]] | None = None,
+        fixup_fields: Iterable[str] = (),
+    ):
+        self.__name__ = name
+        self.parts = list(parts)
+        self.steps = []
+        fields = []
+        for part, function in parts.items():
+            params = tuple(inspect.signature(function).parameters)
+            # parameters not produced by an earlier part come from the row
+            fields += [
+                param
+                for param in params
+                if param not in fields and param not in self.parts[: len(self.steps)]
+            ]
+            self.steps.append((part, function, params))
+        fields += [
+            field
+            for field in fixup_fields
+            if field not in fields and field not in self.parts
+        ]
+        self.fields = tuple(fields)
+        self.fixup = fixup
+        self.overrides = overrides or {}
+        self.cache_clear()
+
+    def __repr__(self) -> str:
+        return f"<Pipeline {self.__name__}: {' -> '.join(self.parts)}>"
+
+    def __call__(self, 小韻: dict[str, Any]) -> dict[str, str]:
+        position = tuple(小韻[field] for field in self.fields)
+        reflex = self._cache.get(position)
+        if reflex is None:
+            reflex = self._cache[position] = self._derive(position, 小韻)
+        self._calls[position] += 1
+
+        override = self.overrides.get(小韻.get("小韻號"))
+        if override is not None:
+            self._override_hits[小韻["小韻號"]] += 1
+            return {**reflex, **override}
+        return dict(reflex)
+
+    def _derive(
+        self, position: tuple[str, ...], 小韻: dict[str, Any]
+    ) -> dict[str, str]:
+        values = dict(zip(self.fields, position))
+        try:
+            for part, function, params in self.steps:
+                values[part] = function(*[values[param] for param in params])
+        except Exception as e:
+            print(
+                小韻.get("小韻號"),
+                {part: values[part] for part in self.parts if part in values},
+            )
+            raise Exception(f"Error in {self.__name__}:", e)
+
+        outcomes = [f"{part} → {values[part]}" for part in self.parts]
+        if self.fixup is not None:
+            before = {part: values[part] for part in self.parts}
+            self.fixup(values)
+            outcomes += [
+                f"{self.fixup.__name__}：{part} {before[part]} → {values[part]}"
+                for part in self.parts
+                if values[part] != before[part]
+            ]
+        self._outcomes[position] = outcomes
+
+        return {part: values[part] for part in self.parts}
+
+    def derive_batch(self, rows: Iterable[dict[str, Any]]) -> list[dict[str, str]]:
+        """Derives every row, in order."""
+        return [self(row) for row in rows]
+
+    def cache_info(self) -> DerivationInfo:
+        outcomes = Counter()
+        for position, count in self._calls.items():
+            for outcome in self._outcomes[position]:
+                outcomes[outcome] += count
+        calls = sum(self._calls.values())
+        return DerivationInfo(
+            positions=len(self._cache),
+            hits=calls - len(self._cache),
+            misses=len(self._cache),
+            outcomes=outcomes,
+            overrides=Counter(self._override_hits),
+        )
+
+    def cache_clear(self) -> None:
+        """Forgets derived positions, e.g. after the part functions change."""
+        self._cache: dict[tuple[str, ...], dict[str, str]] = {}
+        self._outcomes: dict[tuple[str, ...], list[str]] = {}
+        self._calls: Counter = Counter()
+        self._override_hits: Counter = Counter()